@@ -0,0 +1,220 @@
+"""Product catalog and return policy store behind get_product_info / get_return_policy.
+
+The catalog is loaded once per process from PRODUCT_CATALOG_PATH (JSON or
+CSV, default data/product_catalog.json) into an in-memory SQLite FTS5 index
+over keys (category names or SKUs), names, categories and aliases. Answer
+strings are formatted at load time, so a lookup is one dict probe for exact
+names and one FTS query otherwise.
+
+Lookups try, in order:
+1. exact key, name or alias (case and whitespace folded),
+2. prefix search on every query word ("laptop" finds "laptops"); words of
+   one or two characters must match a whole term, and single characters,
+   punctuation and stop words are ignored,
+3. the same search after correcting misspelled words against the index
+   vocabulary ("hedphones" finds "headphones").
+
+Every query word must match; anything else is reported as not found (or
+gets the default return policy) rather than guessed.
+
+JSON layout:
+    {"products": [{"key": ..., "name": ..., "aliases": [...], "category": ..., "warranty": ..., ...}],
+     "return_policies": [{"key": ..., "name": ..., "aliases": [...], "window": ..., ...}],
+     "default_return_policy": {"window": ..., ...}}
+
+CSV layout: a header row with kind (product or return_policy), key, name,
+aliases (separated by ";"), optional category, then the fields above. A
+return_policy row with key "default" is the default policy.
+"""
+import csv
+import difflib
+import functools
+import json
+import os
+import re
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional
+
+DEFAULT_CATALOG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "product_catalog.json")
+PRODUCT_CATALOG_PATH = os.getenv("PRODUCT_CATALOG_PATH", DEFAULT_CATALOG_PATH)
+# Minimum similarity for correcting a misspelled query word
+FUZZY_CUTOFF = 0.75
+# Resolved queries kept per catalog; broad searches over a large catalog take a few ms
+LOOKUP_CACHE_SIZE = 4096
+# Shorter words only match whole terms ("tv"); prefix matching them finds nearly anything
+MIN_PREFIX_LENGTH = 3
+# Words that carry no product meaning and would otherwise prefix-match ("and" -> "android")
+STOP_WORDS = frozenset({"a", "an", "and", "or", "not", "near", "the", "for", "with", "of", "my", "to", "in", "on"})
+
+PRODUCT = "product"
+RETURN_POLICY = "return_policy"
+
+_catalog: Optional["Catalog"] = None
+_catalog_lock = threading.Lock()
+
+
+def _normalize(text: str) -> str:
+    return " ".join(str(text).lower().split())
+
+
+def _words(text: str) -> List[str]:
+    """Searchable query words: punctuation, single characters and stop words are dropped."""
+    return [w for w in re.findall(r"\w+", text.lower()) if len(w) > 1 and w not in STOP_WORDS]
+
+
+def _match_expression(words: List[str]) -> str:
+    # Quoted so words are never read as FTS operators
+    return " ".join(f'"{w}"*' if len(w) >= MIN_PREFIX_LENGTH else f'"{w}"' for w in words)
+
+
+def format_product(name: str, product: Dict[str, Any]) -> str:
+    return f"Technical Information - {name}:\n\n" \
+           f"• Warranty: {product['warranty']}\n" \
+           f"• Specifications: {product['specs']}\n" \
+           f"• Key Features: {product['features']}\n" \
+           f"• Compatibility: {product['compatibility']}\n" \
+           f"• Support: {product['support']}"
+
+
+def format_return_policy(name: str, policy: Dict[str, Any]) -> str:
+    return f"Return Policy - {name}:\n\n" \
+           f"• Return window: {policy['window']} from delivery\n" \
+           f"• Condition: {policy['condition']}\n" \
+           f"• Process: {policy['process']}\n" \
+           f"• Refund timeline: {policy['refund_time']}\n" \
+           f"• Shipping: {policy['shipping']}\n" \
+           f"• Warranty: {policy['warranty']}"
+
+
+def load_entries(path: str) -> List[Dict[str, Any]]:
+    """Read a JSON or CSV catalog into a list of entries, each with a "kind"."""
+    if path.lower().endswith(".csv"):
+        with open(path, newline="", encoding="utf-8") as f:
+            entries = []
+            for row in csv.DictReader(f):
+                row["aliases"] = [a.strip() for a in (row.get("aliases") or "").split(";") if a.strip()]
+                entries.append(row)
+            return entries
+
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    entries = [{"kind": PRODUCT, **p} for p in data.get("products", [])]
+    entries += [{"kind": RETURN_POLICY, **p} for p in data.get("return_policies", [])]
+    if "default_return_policy" in data:
+        entries.append({"kind": RETURN_POLICY, "key": "default", **data["default_return_policy"]})
+    return entries
+
+
+class Catalog:
+    def __init__(self, entries: List[Dict[str, Any]]):
+        self._db = sqlite3.connect(":memory:", check_same_thread=False)
+        self._db.execute(
+            "CREATE VIRTUAL TABLE catalog USING fts5("
+            "kind UNINDEXED, key, name, category, aliases, prefix='2 3 4')"
+        )
+        # The connection is shared by the agent's tool threads
+        self._lock = threading.Lock()
+        self._answers: Dict[int, str] = {}
+        self.lookup = functools.lru_cache(maxsize=LOOKUP_CACHE_SIZE)(self._lookup)
+        self._exact: Dict[tuple, int] = {}
+        self.default_return_policy: Optional[Dict[str, Any]] = None
+
+        rows = []
+        for rowid, entry in enumerate(entries, start=1):
+            kind, key = entry["kind"], str(entry["key"])
+            if kind == RETURN_POLICY and key == "default":
+                self.default_return_policy = entry
+                continue
+            name = entry.get("name") or key.title()
+            aliases = entry.get("aliases") or []
+            if kind == PRODUCT:
+                self._answers[rowid] = format_product(name, entry)
+            elif kind == RETURN_POLICY:
+                self._answers[rowid] = format_return_policy(name, entry)
+            else:
+                raise ValueError(f"Unknown catalog entry kind: {kind}")
+            for label in [key, name, *aliases]:
+                self._exact.setdefault((kind, _normalize(label)), rowid)
+            rows.append((rowid, kind, key, name, entry.get("category") or "", " ".join(aliases)))
+
+        self._db.executemany(
+            "INSERT INTO catalog (rowid, kind, key, name, category, aliases) VALUES (?, ?, ?, ?, ?, ?)", rows
+        )
+        self._db.execute("CREATE VIRTUAL TABLE catalog_vocab USING fts5vocab(catalog, row)")
+        self._vocabulary = set()
+        # Spelling candidates grouped by first letter; numbers and SKU codes are never corrected
+        self._candidates: Dict[str, List[str]] = {}
+        for (term,) in self._db.execute("SELECT term FROM catalog_vocab"):
+            self._vocabulary.add(term)
+            if term.isalpha():
+                self._candidates.setdefault(term[0], []).append(term)
+
+    def __len__(self):
+        return len(self._answers)
+
+    def _search(self, kind: str, words: List[str]) -> Optional[int]:
+        match = _match_expression(words)
+        with self._lock:
+            row = self._db.execute(
+                "SELECT rowid FROM catalog WHERE catalog MATCH ? AND kind = ? ORDER BY rank LIMIT 1",
+                (match, kind),
+            ).fetchone()
+        return row[0] if row else None
+
+    def _correct(self, word: str) -> str:
+        if word in self._vocabulary or len(word) < 3 or not word.isalpha():
+            return word
+        close = difflib.get_close_matches(word, self._candidates.get(word[0], []), n=1, cutoff=FUZZY_CUTOFF)
+        return close[0] if close else word
+
+    def _lookup(self, kind: str, query: str) -> Optional[str]:
+        """Return the precomputed answer for the best match, or None (cached as self.lookup)."""
+        rowid = self._exact.get((kind, _normalize(query)))
+        if rowid is None:
+            words = _words(query)
+            if not words:
+                return None
+            rowid = self._search(kind, words)
+            if rowid is None:
+                corrected = [self._correct(w) for w in words]
+                # Every word has to match: a partial match ("smart watch" -> smartphones)
+                # would be a confident wrong answer, so fall through to not-found instead
+                rowid = self._search(kind, corrected) if corrected != words else None
+        return self._answers.get(rowid) if rowid is not None else None
+
+    def product_info(self, product_type: str) -> str:
+        answer = self.lookup(PRODUCT, product_type)
+        if answer is None:
+            return f"Technical specifications for {product_type} not available. Please contact our technical support team for detailed product information and compatibility requirements."
+        return answer
+
+    def return_policy(self, product_category: str) -> str:
+        answer = self.lookup(RETURN_POLICY, product_category)
+        if answer is None and self.default_return_policy is not None:
+            # Default policy for unlisted categories
+            return format_return_policy(product_category.title(), self.default_return_policy)
+        if answer is None:
+            return f"Return policy for {product_category} not available. Please contact our technical support team."
+        return answer
+
+
+def get_catalog() -> Catalog:
+    """The process-wide catalog, loaded from PRODUCT_CATALOG_PATH on first use."""
+    global _catalog
+    with _catalog_lock:
+        if _catalog is None:
+            _catalog = Catalog(load_entries(PRODUCT_CATALOG_PATH))
+        return _catalog
+
+
+if __name__ == "__main__":
+    # Regression checks against the bundled catalog: python -m lab_helpers.catalog
+    catalog = Catalog(load_entries(DEFAULT_CATALOG_PATH))
+    for query, expected in [("laptop", "Laptops"), ("hedphones", "Headphones"), ("Phone", "Smartphones")]:
+        assert catalog.lookup(PRODUCT, query).startswith(f"Technical Information - {expected}:"), query
+    for query in ["a", "c++", "AND", "smart watch", "laptop charger", "gaming monitor", "!!", ""]:
+        assert catalog.lookup(PRODUCT, query) is None, query
+        assert catalog.lookup(RETURN_POLICY, query) is None, query
+    assert catalog.return_policy("gaming laptop bag").startswith("Return Policy - Gaming Laptop Bag:")
+    print(f"Catalog checks passed ({len(catalog)} entries)")
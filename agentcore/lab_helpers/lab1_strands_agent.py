@@ -1,8 +1,9 @@
 from strands.tools import tool
 from ddgs.exceptions import DDGSException, RatelimitException
-from ddgs import DDGS
 from strands_tools import retrieve
-import boto3
+from scripts.utils import get_aws_identity, get_ssm_parameter
+from lab_helpers.catalog import get_catalog
+from lab_helpers.web_search_service import get_search_service
 
 MODEL_ID = "us.anthropic.claude-sonnet-4-20250514-v1:0"
 
@@ -35,7 +36,7 @@ def web_search(keywords: str, region: str = "us-en", max_results: int = 5) -> st
     
     """
     try:
-        results = DDGS().text(keywords, region=region, max_results=max_results)
+        results = get_search_service().search(keywords, region=region, max_results=max_results)
         return results if results else "No results found."
     except RatelimitException:
         return "Rate limit reached. Please try again later."
@@ -56,52 +57,8 @@ def get_return_policy(product_category: str) -> str:
     Returns:
         Formatted return policy details including timeframes and conditions
     """
-    # Mock return policy database - in real implementation, this would query policy database
-    return_policies = {
-        "smartphones": {
-            "window": "30 days",
-            "condition": "Original packaging, no physical damage, factory reset required",
-            "process": "Online RMA portal or technical support",
-            "refund_time": "5-7 business days after inspection",
-            "shipping": "Free return shipping, prepaid label provided",
-            "warranty": "1-year manufacturer warranty included"
-        },
-         "laptops": {
-            "window": "30 days", 
-            "condition": "Original packaging, all accessories, no software modifications",
-            "process": "Technical support verification required before return",
-            "refund_time": "7-10 business days after inspection",
-            "shipping": "Free return shipping with original packaging",
-            "warranty": "1-year manufacturer warranty, extended options available"
-        },
-        "accessories": {
-            "window": "30 days",
-            "condition": "Unopened packaging preferred, all components included",
-            "process": "Online return portal",
-            "refund_time": "3-5 business days after receipt",
-            "shipping": "Customer pays return shipping under $50",
-            "warranty": "90-day manufacturer warranty"
-        }
-    }
-
-    # Default policy for unlisted categories
-    default_policy = {
-        "window": "30 days",
-        "condition": "Original condition with all included components",
-        "process": "Contact technical support",
-        "refund_time": "5-7 business days after inspection", 
-        "shipping": "Return shipping policies vary",
-        "warranty": "Standard manufacturer warranty applies"
-    }
-
-    policy = return_policies.get(product_category.lower(), default_policy)
-    return f"Return Policy - {product_category.title()}:\n\n" \
-           f"• Return window: {policy['window']} from delivery\n" \
-           f"• Condition: {policy['condition']}\n" \
-           f"• Process: {policy['process']}\n" \
-           f"• Refund timeline: {policy['refund_time']}\n" \
-           f"• Shipping: {policy['shipping']}\n" \
-           f"• Warranty: {policy['warranty']}"
+    # Indexed lookup over lab_helpers/data/product_catalog.json (or PRODUCT_CATALOG_PATH)
+    return get_catalog().return_policy(product_category)
 
 
 @tool
@@ -114,58 +71,15 @@ def get_product_info(product_type: str) -> str:
     Returns:
         Formatted product information including warranty, features, and policies
     """
-    # Mock product catalog - in real implementation, this would query a product database
-    products = {
-        "laptops": {
-            "warranty": "1-year manufacturer warranty + optional extended coverage",
-            "specs": "Intel/AMD processors, 8-32GB RAM, SSD storage, various display sizes",
-            "features": "Backlit keyboards, USB-C/Thunderbolt, Wi-Fi 6, Bluetooth 5.0",
-            "compatibility": "Windows 11, macOS, Linux support varies by model",
-            "support": "Technical support and driver updates included"
-        },
-        "smartphones": {
-            "warranty": "1-year manufacturer warranty",
-            "specs": "5G/4G connectivity, 128GB-1TB storage, multiple camera systems",
-            "features": "Wireless charging, water resistance, biometric security",
-            "compatibility": "iOS/Android, carrier unlocked options available",
-            "support": "Software updates and technical support included"
-        },
-        "headphones": {
-            "warranty": "1-year manufacturer warranty",
-            "specs": "Wired/wireless options, noise cancellation, 20Hz-20kHz frequency",
-            "features": "Active noise cancellation, touch controls, voice assistant",
-            "compatibility": "Bluetooth 5.0+, 3.5mm jack, USB-C charging",
-            "support": "Firmware updates via companion app"
-        },
-        "monitors": {
-            "warranty": "3-year manufacturer warranty",
-            "specs": "4K/1440p/1080p resolutions, IPS/OLED panels, various sizes",
-            "features": "HDR support, high refresh rates, adjustable stands",
-            "compatibility": "HDMI, DisplayPort, USB-C inputs",
-            "support": "Color calibration and technical support"
-        }
-    }
-    product = products.get(product_type.lower())
-    if not product:
-        return f"Technical specifications for {product_type} not available. Please contact our technical support team for detailed product information and compatibility requirements."
-
-    return f"Technical Information - {product_type.title()}:\n\n" \
-           f"• Warranty: {product['warranty']}\n" \
-           f"• Specifications: {product['specs']}\n" \
-           f"• Key Features: {product['features']}\n" \
-           f"• Compatibility: {product['compatibility']}\n" \
-           f"• Support: {product['support']}"
+    # Indexed lookup over lab_helpers/data/product_catalog.json (or PRODUCT_CATALOG_PATH)
+    return get_catalog().product_info(product_type)
 
 @tool
 def get_technical_support(issue_description: str) -> str:
 	try:
-		# Get KB ID from parameter store
-		ssm = boto3.client('ssm')
-		account_id = boto3.client('sts').get_caller_identity()['Account']
-		region = boto3.Session().region_name
-
-		kb_id = ssm.get_parameter(Name=f"/{account_id}-{region}/kb/knowledge-base-id")['Parameter']['Value']
-		print(f"Successfully retrieved KB ID: {kb_id}")
+		# Get KB ID from parameter store; account, region and the ID are cached after the first call
+		account_id, region = get_aws_identity()
+		kb_id = get_ssm_parameter(f"/{account_id}-{region}/kb/knowledge-base-id")
 
 		# Use strands retrieve tool
 		tool_use = {
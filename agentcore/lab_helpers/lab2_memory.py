@@ -5,13 +5,15 @@ import logging
 import os
 import sys
 import uuid
-from typing import Dict
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Dict, List
 
 import boto3
 from bedrock_agentcore.memory import MemoryClient
 from bedrock_agentcore.memory.constants import StrategyType
 from boto3.session import Session
 from botocore.exceptions import ClientError
+from opentelemetry import metrics
 from strands.hooks import (
     AfterInvocationEvent,
     HookProvider,
@@ -31,6 +33,23 @@ SESSION_ID = str(uuid.uuid4())
 memory_client = MemoryClient(region_name=REGION)
 memory_name = "CustomerSupportMemory"
 
+# Seconds a user message may wait for memory retrieval across all namespaces. Namespaces
+# are retrieved in parallel and a semantic retrieval often takes about a second, so this
+# leaves room for a slow call; lower it only while watching the skipped-namespace metric.
+MEMORY_RETRIEVAL_TIMEOUT = float(os.getenv("MEMORY_RETRIEVAL_TIMEOUT", "5"))
+# Shared by all hooks in the process, so concurrent sessions don't each spawn threads.
+# A retrieval that misses the deadline keeps its worker until it returns, hence the headroom.
+_retrieval_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("MEMORY_RETRIEVAL_WORKERS", "16")),
+    thread_name_prefix="memory-retrieval",
+)
+# Exported with the rest of the agent's telemetry on AgentCore Runtime
+_namespaces_skipped = metrics.get_meter(__name__).create_counter(
+    "memory.retrieval.namespaces_skipped",
+    unit="1",
+    description="Memory namespaces left out of a turn's context (reason: timeout or error)",
+)
+
 
 def create_or_get_memory_resource():
     try:
@@ -108,26 +127,33 @@ class CustomerSupportMemoryHooks(HookProvider):
             user_query = messages[-1]["content"][0]["text"]
 
             try:
-                all_context = []
-
-                for context_type, namespace in self.namespaces.items():
-                    # *** AGENTCORE MEMORY USAGE *** - Retrieve customer context from each namespace
-                    memories = self.client.retrieve_memories(
+                # *** AGENTCORE MEMORY USAGE *** - Retrieve customer context from all namespaces at once
+                futures = {
+                    context_type: _retrieval_executor.submit(
+                        self.client.retrieve_memories,
                         memory_id=self.memory_id,
                         namespace=namespace.format(actorId=self.actor_id),
                         query=user_query,
                         top_k=3,
                     )
-                    # Post-processing: Format memories into context strings
-                    for memory in memories:
-                        if isinstance(memory, dict):
-                            content = memory.get("content", {})
-                            if isinstance(content, dict):
-                                text = content.get("text", "").strip()
-                                if text:
-                                    all_context.append(
-                                        f"[{context_type.upper()}] {text}"
-                                    )
+                    for context_type, namespace in self.namespaces.items()
+                }
+                wait(futures.values(), timeout=MEMORY_RETRIEVAL_TIMEOUT)
+
+                all_context = []
+                for context_type, future in futures.items():
+                    if not future.done():
+                        # Answer without this namespace rather than hold up the turn
+                        future.cancel()
+                        _namespaces_skipped.add(1, {"context_type": context_type, "reason": "timeout"})
+                        logger.warning(
+                            f"Skipped {context_type} memories: no response within {MEMORY_RETRIEVAL_TIMEOUT}s"
+                        )
+                    elif future.exception() is not None:
+                        _namespaces_skipped.add(1, {"context_type": context_type, "reason": "error"})
+                        logger.error(f"Failed to retrieve {context_type} memories: {future.exception()}")
+                    else:
+                        all_context.extend(self._format_memories(context_type, future.result()))
 
                 # Inject customer context into the query
                 if all_context:
@@ -141,6 +167,19 @@ class CustomerSupportMemoryHooks(HookProvider):
             except Exception as e:
                 logger.error(f"Failed to retrieve customer context: {e}")
 
+    @staticmethod
+    def _format_memories(context_type: str, memories) -> List[str]:
+        """Post-processing: Format memories into context strings"""
+        context = []
+        for memory in memories:
+            if isinstance(memory, dict):
+                content = memory.get("content", {})
+                if isinstance(content, dict):
+                    text = content.get("text", "").strip()
+                    if text:
+                        context.append(f"[{context_type.upper()}] {text}")
+        return context
+
     def save_support_interaction(self, event: AfterInvocationEvent):
         """Save customer support interaction after agent response"""
         try:
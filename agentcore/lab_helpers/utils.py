@@ -9,7 +9,21 @@ import boto3
 import yaml
 from boto3.session import Session
 
-sts_client = boto3.client("sts")
+# Client, parameter and identity caching is shared with scripts/utils.py
+from scripts.utils import (  # noqa: F401
+    delete_ssm_parameter,
+    get_aws_account_id,
+    get_aws_identity,
+    get_client,
+    get_cognito_client_secret,
+    get_ssm_parameter,
+    get_ssm_parameters,
+    load_api_spec,
+    parameter_cache,
+    put_ssm_parameter,
+)
+
+sts_client = get_client("sts")
 
 # Get AWS account details
 REGION = boto3.session.Session().region_name
@@ -21,66 +35,11 @@ role_name = f"CustomerSupportAssistantBedrockAgentCoreRole-{REGION}"
 policy_name = f"CustomerSupportAssistantBedrockAgentCorePolicy-{REGION}"
 
 
-def get_ssm_parameter(name: str, with_decryption: bool = True) -> str:
-    ssm = boto3.client("ssm")
-
-    response = ssm.get_parameter(Name=name, WithDecryption=with_decryption)
-
-    return response["Parameter"]["Value"]
-
-def put_ssm_parameter(
-    name: str, value: str, parameter_type: str = "String", with_encryption: bool = False
-) -> None:
-    ssm = boto3.client("ssm")
-
-    put_params = {
-        "Name": name,
-        "Value": value,
-        "Type": parameter_type,
-        "Overwrite": True,
-    }
-
-    if with_encryption:
-        put_params["Type"] = "SecureString"
-
-    ssm.put_parameter(**put_params)
-
-
-def delete_ssm_parameter(name: str) -> None:
-    ssm = boto3.client("ssm")
-    try:
-        ssm.delete_parameter(Name=name)
-    except ssm.exceptions.ParameterNotFound:
-        pass
-
-
-def load_api_spec(file_path: str) -> list:
-    with open(file_path, "r") as f:
-        data = json.load(f)
-    if not isinstance(data, list):
-        raise ValueError("Expected a list in the JSON file")
-    return data
-
-
 def get_aws_region() -> str:
     session = Session()
     return session.region_name
 
 
-def get_aws_account_id() -> str:
-    sts = boto3.client("sts")
-    return sts.get_caller_identity()["Account"]
-
-
-def get_cognito_client_secret() -> str:
-    client = boto3.client("cognito-idp")
-    response = client.describe_user_pool_client(
-        UserPoolId=get_ssm_parameter("/app/customersupport/agentcore/userpool_id"),
-        ClientId=get_ssm_parameter("/app/customersupport/agentcore/machine_client_id"),
-    )
-    return response["UserPoolClient"]["ClientSecret"]
-
-
 def read_config(file_path: str) -> Dict[str, Any]:
     """
     Read configuration from a file path. Supports JSON, YAML, and YML formats.
@@ -139,7 +98,7 @@ def save_customer_support_secret(secret_value):
     """Save a secret in AWS Secrets Manager."""
     boto_session = Session()
     region = boto_session.region_name
-    secrets_client = boto3.client("secretsmanager", region_name=region)
+    secrets_client = get_client("secretsmanager", region_name=region)
 
     try:
         secrets_client.create_secret(
@@ -161,7 +120,7 @@ def get_customer_support_secret():
     """Get a secret value from AWS Secrets Manager."""
     boto_session = Session()
     region = boto_session.region_name
-    secrets_client = boto3.client("secretsmanager", region_name=region)
+    secrets_client = get_client("secretsmanager", region_name=region)
     try:
         response = secrets_client.get_secret_value(SecretId=secret_name)
         return response["SecretString"]
@@ -174,7 +133,7 @@ def delete_customer_support_secret():
     """Delete a secret from AWS Secrets Manager."""
     boto_session = Session()
     region = boto_session.region_name
-    secrets_client = boto3.client("secretsmanager", region_name=region)
+    secrets_client = get_client("secretsmanager", region_name=region)
     try:
         secrets_client.delete_secret(
             SecretId=secret_name, ForceDeleteWithoutRecovery=True
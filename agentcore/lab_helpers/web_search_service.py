@@ -0,0 +1,171 @@
+"""Shared web search service for the customer support agent.
+
+Every web_search call goes through one process-wide WebSearchService:
+
+- a token bucket keeps us under the search backend's rate limit instead of
+  finding it with a "Rate limit reached" error,
+- results are cached per normalized query (case and whitespace folded) for
+  WEB_SEARCH_CACHE_TTL seconds,
+- identical queries that arrive while one is in flight wait for its result
+  instead of issuing their own request.
+
+Strands runs the tool calls of one model turn concurrently, so several
+web_search calls in a turn already search in parallel through this service.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Dict, List, Optional, Tuple
+
+from ddgs import DDGS
+from ddgs.exceptions import RatelimitException
+
+WEB_SEARCH_RATE = float(os.getenv("WEB_SEARCH_RATE", "1.0"))  # searches per second
+WEB_SEARCH_BURST = int(os.getenv("WEB_SEARCH_BURST", "3"))
+WEB_SEARCH_MAX_WAIT = float(os.getenv("WEB_SEARCH_MAX_WAIT", "10"))  # seconds a call may queue for a token
+WEB_SEARCH_RETRIES = int(os.getenv("WEB_SEARCH_RETRIES", "2"))
+WEB_SEARCH_CACHE_TTL = float(os.getenv("WEB_SEARCH_CACHE_TTL", "900"))
+WEB_SEARCH_CACHE_SIZE = int(os.getenv("WEB_SEARCH_CACHE_SIZE", "512"))
+
+SearchKey = Tuple[str, str, int]
+
+_service: Optional["WebSearchService"] = None
+_service_lock = threading.Lock()
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens per second, at most `burst` saved up."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, timeout: float) -> bool:
+        """Take a token, waiting up to `timeout` seconds; False if none became available."""
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+            if now + wait > deadline:
+                return False
+            time.sleep(wait)
+
+    def drain(self):
+        """Give up saved tokens, e.g. after the backend reported a rate limit."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = min(self._tokens, 0.0)
+
+
+class WebSearchService:
+    def __init__(
+        self,
+        rate: float = WEB_SEARCH_RATE,
+        burst: int = WEB_SEARCH_BURST,
+        max_wait: float = WEB_SEARCH_MAX_WAIT,
+        retries: int = WEB_SEARCH_RETRIES,
+        cache_ttl: float = WEB_SEARCH_CACHE_TTL,
+        cache_size: int = WEB_SEARCH_CACHE_SIZE,
+    ):
+        self.bucket = TokenBucket(rate, burst)
+        self.max_wait = max_wait
+        self.retries = retries
+        self.cache_ttl = cache_ttl
+        self.cache_size = cache_size
+        self.stats = {"requests": 0, "cache_hits": 0, "coalesced": 0, "backend_calls": 0, "rate_limited": 0}
+        self._cache: "OrderedDict[SearchKey, Tuple[float, List[dict]]]" = OrderedDict()
+        self._inflight: Dict[SearchKey, Future] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    @staticmethod
+    def normalize(keywords: str) -> str:
+        return " ".join(keywords.lower().split())
+
+    def search(self, keywords: str, region: str = "us-en", max_results: int = 5) -> List[dict]:
+        """Search, serving from cache or an identical in-flight search when possible.
+
+        Raises RatelimitException if no search slot frees up within max_wait
+        or the backend keeps rate limiting us.
+        """
+        key = (self.normalize(keywords), region, max_results)
+        with self._lock:
+            self.stats["requests"] += 1
+            cached = self._cache.get(key)
+            if cached is not None and cached[0] > time.monotonic():
+                self._cache.move_to_end(key)
+                self.stats["cache_hits"] += 1
+                return cached[1]
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = Future()
+            else:
+                self.stats["coalesced"] += 1
+
+        if not owner:
+            return future.result()
+
+        try:
+            results = self._fetch(*key)
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        else:
+            with self._lock:
+                self._cache[key] = (time.monotonic() + self.cache_ttl, results)
+                self._cache.move_to_end(key)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+            future.set_result(results)
+            return results
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def _ddgs(self) -> DDGS:
+        # One client per thread: reuses its HTTP connections without sharing it across threads
+        ddgs = getattr(self._local, "ddgs", None)
+        if ddgs is None:
+            ddgs = self._local.ddgs = DDGS()
+        return ddgs
+
+    def _fetch(self, keywords: str, region: str, max_results: int) -> List[dict]:
+        for attempt in range(self.retries + 1):
+            if not self.bucket.acquire(self.max_wait):
+                with self._lock:
+                    self.stats["rate_limited"] += 1
+                raise RatelimitException("Too many searches in progress")
+            with self._lock:
+                self.stats["backend_calls"] += 1
+            try:
+                return self._ddgs().text(keywords, region=region, max_results=max_results) or []
+            except RatelimitException:
+                with self._lock:
+                    self.stats["rate_limited"] += 1
+                if attempt == self.retries:
+                    raise
+                # Back off: the next attempt has to wait for a fresh token
+                self.bucket.drain()
+
+
+def get_search_service() -> WebSearchService:
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = WebSearchService()
+        return _service
@@ -1,5 +1,20 @@
+import os
+import time
+
 from ddgs import DDGS
 
+# Warm containers keep module state between invocations, so reuse one client
+# and cache recent results. A container serves one invocation at a time and
+# containers share nothing, so pacing and request coalescing live in the
+# agent-side search service (lab_helpers/web_search_service.py), not here.
+SEARCH_CACHE_TTL = float(os.getenv("WEB_SEARCH_CACHE_TTL", "900"))
+SEARCH_CACHE_SIZE = int(os.getenv("WEB_SEARCH_CACHE_SIZE", "256"))
+# Single attempt that finishes well inside the function's 10 s timeout
+SEARCH_TIMEOUT = int(os.getenv("WEB_SEARCH_TIMEOUT", "5"))
+
+_ddgs = None
+_cache = {}
+
 
 def web_search(keywords: str, region: str = "us-en", max_results: int = 5) -> str:
     """Search the web for updated information.
@@ -12,11 +27,25 @@ def web_search(keywords: str, region: str = "us-en", max_results: int = 5) -> st
     Returns:
         List of dictionaries with search results.
     """
+    global _ddgs
+    key = (" ".join(keywords.lower().split()), region, max_results)
+    cached = _cache.get(key)
+    if cached is not None and cached[0] > time.monotonic():
+        return cached[1]
     try:
-        results = DDGS().text(keywords, region=region, max_results=max_results)
-        return results if results else "No results found."
+        if _ddgs is None:
+            _ddgs = DDGS(timeout=SEARCH_TIMEOUT)
+        results = _ddgs.text(keywords, region=region, max_results=max_results)
+        results = results if results else "No results found."
     except Exception as e:
         return f"Search error: {str(e)}"
 
+    _cache.pop(key, None)
+    _cache[key] = (time.monotonic() + SEARCH_CACHE_TTL, results)
+    while len(_cache) > SEARCH_CACHE_SIZE:
+        # Dicts keep insertion order: drop the oldest entry
+        del _cache[next(iter(_cache))]
+    return results
+
 
-print("✅ Web search tool ready")
\ No newline at end of file
+print("✅ Web search tool ready")
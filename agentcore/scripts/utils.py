@@ -1,11 +1,22 @@
 import json
 import os
-from typing import Any, Dict
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional, Tuple
 
 import boto3
 import yaml
 from retrying import retry
 
+# Seconds an SSM parameter value is reused before it is read again
+SSM_CACHE_TTL = float(os.getenv("SSM_CACHE_TTL", "300"))
+# GetParameters accepts at most 10 names per call
+SSM_BATCH_SIZE = 10
+
+_clients: Dict[Tuple[str, Optional[str]], Any] = {}
+_clients_lock = threading.Lock()
+_identity: Optional[Tuple[str, str]] = None
+
 
 # Retry logic for handling throttling and service unavailable errors
 def should_retry(exception):
@@ -18,18 +29,100 @@ def should_retry(exception):
 def call_with_retry(f):
     return f()
 
+def get_client(service_name: str, region_name: Optional[str] = None):
+    """Return a boto3 client shared by the whole process (boto3 clients are thread-safe)."""
+    key = (service_name, region_name)
+    client = _clients.get(key)
+    if client is None:
+        # Client creation itself is not thread-safe
+        with _clients_lock:
+            client = _clients.get(key)
+            if client is None:
+                client = boto3.client(service_name, region_name=region_name)
+                _clients[key] = client
+    return client
+
+
+class ParameterCache:
+    """TTL cache in front of SSM Parameter Store.
+
+    Misses are fetched together with GetParameters, so reading several
+    parameters costs one round trip per ten names instead of one per name.
+    """
+
+    def __init__(self, ttl: float = SSM_CACHE_TTL):
+        self.ttl = ttl
+        self._values: Dict[Tuple[str, bool], Tuple[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def get_many(self, names: Iterable[str], with_decryption: bool = True) -> Dict[str, str]:
+        names = list(dict.fromkeys(names))
+        now = time.monotonic()
+        found, missing = {}, []
+        with self._lock:
+            for name in names:
+                entry = self._values.get((name, with_decryption))
+                if entry is not None and entry[1] > now:
+                    found[name] = entry[0]
+                else:
+                    missing.append(name)
+
+        ssm = get_client("ssm")
+        for i in range(0, len(missing), SSM_BATCH_SIZE):
+            response = ssm.get_parameters(
+                Names=missing[i : i + SSM_BATCH_SIZE], WithDecryption=with_decryption
+            )
+            with self._lock:
+                for parameter in response["Parameters"]:
+                    found[parameter["Name"]] = parameter["Value"]
+                    self._values[(parameter["Name"], with_decryption)] = (
+                        parameter["Value"],
+                        now + self.ttl,
+                    )
+
+        not_found = [name for name in names if name not in found]
+        if not_found:
+            # Same exception get_parameter raises for a missing name
+            raise ssm.exceptions.ParameterNotFound(
+                {"Error": {"Code": "ParameterNotFound", "Message": f"Parameters not found: {not_found}"}},
+                "GetParameters",
+            )
+        return found
+
+    def get(self, name: str, with_decryption: bool = True) -> str:
+        return self.get_many([name], with_decryption)[name]
+
+    def set(self, name: str, value: str):
+        expires_at = time.monotonic() + self.ttl
+        with self._lock:
+            for with_decryption in (True, False):
+                self._values[(name, with_decryption)] = (value, expires_at)
+
+    def invalidate(self, name: Optional[str] = None):
+        with self._lock:
+            if name is None:
+                self._values.clear()
+            else:
+                self._values.pop((name, True), None)
+                self._values.pop((name, False), None)
+
+
+parameter_cache = ParameterCache()
+
+
 def get_ssm_parameter(name: str, with_decryption: bool = True) -> str:
-    ssm = boto3.client("ssm")
+    return parameter_cache.get(name, with_decryption)
 
-    response = ssm.get_parameter(Name=name, WithDecryption=with_decryption)
 
-    return response["Parameter"]["Value"]
+def get_ssm_parameters(*names: str, with_decryption: bool = True) -> Dict[str, str]:
+    """Read several parameters in one GetParameters call (or none, if they are cached)."""
+    return parameter_cache.get_many(names, with_decryption)
 
 
 def put_ssm_parameter(
     name: str, value: str, parameter_type: str = "String", with_encryption: bool = False
 ) -> None:
-    ssm = boto3.client("ssm")
+    ssm = get_client("ssm")
 
     put_params = {
         "Name": name,
@@ -42,10 +135,12 @@ def put_ssm_parameter(
         put_params["Type"] = "SecureString"
 
     ssm.put_parameter(**put_params)
+    parameter_cache.set(name, value)
 
 
 def delete_ssm_parameter(name: str) -> None:
-    ssm = boto3.client("ssm")
+    ssm = get_client("ssm")
+    parameter_cache.invalidate(name)
     try:
         ssm.delete_parameter(Name=name)
     except ssm.exceptions.ParameterNotFound:
@@ -60,21 +155,33 @@ def load_api_spec(file_path: str) -> list:
     return data
 
 
+def get_aws_identity() -> Tuple[str, str]:
+    """Return (account_id, region); STS is called once per process."""
+    global _identity
+    if _identity is None:
+        account_id = get_client("sts").get_caller_identity()["Account"]
+        _identity = (account_id, boto3.session.Session().region_name)
+    return _identity
+
+
 def get_aws_region() -> str:
     session = boto3.session.Session()
     return session.region_name
 
 
 def get_aws_account_id() -> str:
-    sts = boto3.client("sts")
-    return sts.get_caller_identity()["Account"]
+    return get_aws_identity()[0]
 
 
 def get_cognito_client_secret() -> str:
-    client = boto3.client("cognito-idp")
+    client = get_client("cognito-idp")
+    params = get_ssm_parameters(
+        "/app/customersupport/agentcore/userpool_id",
+        "/app/customersupport/agentcore/machine_client_id",
+    )
     response = client.describe_user_pool_client(
-        UserPoolId=get_ssm_parameter("/app/customersupport/agentcore/userpool_id"),
-        ClientId=get_ssm_parameter("/app/customersupport/agentcore/machine_client_id"),
+        UserPoolId=params["/app/customersupport/agentcore/userpool_id"],
+        ClientId=params["/app/customersupport/agentcore/machine_client_id"],
     )
     return response["UserPoolClient"]["ClientSecret"]
 
@@ -0,0 +1,71 @@
+"""Admission control for concurrent S2S sessions in one server process."""
+import asyncio
+import os
+
+MAX_CONCURRENT_SESSIONS = int(os.getenv("MAX_CONCURRENT_SESSIONS", "100"))
+# Sessions allowed to wait for a free slot; 0 rejects immediately when full
+ADMISSION_QUEUE_SIZE = int(os.getenv("ADMISSION_QUEUE_SIZE", "0"))
+ADMISSION_QUEUE_TIMEOUT = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "2.0"))
+# Report not-ready once this share of the slots is taken, so new calls go elsewhere first
+READY_UTILIZATION = float(os.getenv("ADMISSION_READY_UTILIZATION", "0.9"))
+
+
+class AdmissionController:
+    """Caps concurrent sessions, with an optional short, deadline-bound wait queue.
+
+    acquire() returns False when the session should be rejected; every
+    successful acquire() must be paired with release().
+    """
+    def __init__(self, max_sessions=MAX_CONCURRENT_SESSIONS, queue_size=ADMISSION_QUEUE_SIZE,
+                 queue_timeout=ADMISSION_QUEUE_TIMEOUT, ready_utilization=READY_UTILIZATION):
+        self.max_sessions = max_sessions
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.ready_utilization = ready_utilization
+        self.active = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected = 0
+        self._slots = asyncio.Semaphore(max_sessions)
+
+    async def acquire(self) -> bool:
+        if not self._slots.locked():
+            await self._slots.acquire()
+        elif self.waiting >= self.queue_size or self.queue_timeout <= 0:
+            self.rejected += 1
+            return False
+        else:
+            self.waiting += 1
+            try:
+                await asyncio.wait_for(self._slots.acquire(), timeout=self.queue_timeout)
+            except asyncio.TimeoutError:
+                self.rejected += 1
+                return False
+            finally:
+                self.waiting -= 1
+        self.active += 1
+        self.admitted += 1
+        return True
+
+    def release(self):
+        self.active -= 1
+        self._slots.release()
+
+    @property
+    def utilization(self) -> float:
+        return self.active / self.max_sessions if self.max_sessions else 1.0
+
+    @property
+    def ready(self) -> bool:
+        """False when the process is close enough to its limit that new calls should go elsewhere."""
+        return self.utilization < self.ready_utilization
+
+    def load(self) -> dict:
+        return {
+            "active_sessions": self.active,
+            "max_sessions": self.max_sessions,
+            "waiting": self.waiting,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "utilization": round(self.utilization, 3),
+        }
@@ -0,0 +1,125 @@
+"""Shared, background-refreshed AWS credentials for the Smithy Bedrock client.
+
+Credentials come from the standard boto3 chain (env vars, profiles, container
+and instance roles). They are resolved once at startup and a daemon thread
+refreshes them ahead of expiry, so get_identity() on a session's critical path
+only reads the cached value and never waits on STS or IMDS.
+"""
+import asyncio
+import os
+import threading
+from datetime import datetime, timezone
+from typing import Optional
+
+import boto3
+from smithy_aws_core.identity import AWSCredentialsIdentity
+
+# Refresh this long before the credentials expire
+REFRESH_MARGIN = int(os.getenv("AWS_CREDENTIALS_REFRESH_MARGIN", "900"))
+# How often the background thread checks expiry (and retries after a failed refresh)
+CHECK_INTERVAL = int(os.getenv("AWS_CREDENTIALS_CHECK_INTERVAL", "60"))
+
+_resolver: Optional["RefreshingCredentialsResolver"] = None
+_resolver_lock = threading.Lock()
+
+
+class RefreshingCredentialsResolver:
+    """Smithy identity resolver backed by the boto3 credential chain."""
+    def __init__(self, region=None, refresh_margin=REFRESH_MARGIN, check_interval=CHECK_INTERVAL):
+        self.region = region or os.getenv("AWS_REGION", "us-east-1")
+        self.refresh_margin = refresh_margin
+        self.check_interval = check_interval
+        self.refreshes = 0
+        self.failures = 0
+        self.last_error = None
+        self._credentials = None
+        self._identity: Optional[AWSCredentialsIdentity] = None
+        self._refresh_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def available(self) -> bool:
+        return self._identity is not None and not self._expiring(0)
+
+    def _expiring(self, margin) -> bool:
+        expiration = self._identity.expiration if self._identity else None
+        if expiration is None:
+            return False
+        return (expiration - datetime.now(timezone.utc)).total_seconds() <= margin
+
+    def refresh(self) -> Optional[AWSCredentialsIdentity]:
+        """Resolve credentials from the chain now. Blocking; keeps the old value on failure."""
+        with self._refresh_lock:
+            try:
+                if self._credentials is None:
+                    self._credentials = boto3.Session(region_name=self.region).get_credentials()
+                    if self._credentials is None:
+                        raise RuntimeError("No credentials found in AWS credential chain")
+                # Refreshable (role) credentials renew themselves here when close to expiry
+                frozen = self._credentials.get_frozen_credentials()
+                # botocore exposes no public accessor for the expiry of refreshable credentials
+                expiration = getattr(self._credentials, "_expiry_time", None)
+                self._identity = AWSCredentialsIdentity(
+                    access_key_id=frozen.access_key,
+                    secret_access_key=frozen.secret_key,
+                    session_token=frozen.token,
+                    expiration=expiration,
+                )
+                self.refreshes += 1
+                self.last_error = None
+            except Exception as ex:
+                # Walk the whole chain again next time
+                self._credentials = None
+                self.failures += 1
+                self.last_error = str(ex)
+                print(f"ERROR: Failed to refresh AWS credentials: {ex}")
+            return self._identity
+
+    def start(self):
+        """Resolve once, then keep the credentials fresh on a daemon thread."""
+        if self._identity is None:
+            self.refresh()
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._refresh_loop, name="aws-credentials", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _refresh_loop(self):
+        while not self._stop.wait(self.check_interval):
+            if self._identity is None or self._expiring(self.refresh_margin):
+                self.refresh()
+
+    async def get_identity(self, *, properties=None, **kwargs) -> AWSCredentialsIdentity:
+        identity = self._identity
+        if identity is None or self._expiring(0):
+            # Only reached if startup or the background refresh failed
+            identity = await asyncio.to_thread(self.refresh)
+            if identity is None:
+                raise RuntimeError(f"AWS credentials unavailable: {self.last_error}")
+        return identity
+
+    async def invalidate(self) -> None:
+        await asyncio.to_thread(self.refresh)
+
+    def status(self) -> dict:
+        expiration = self._identity.expiration if self._identity else None
+        return {
+            "available": self.available,
+            "expires_in": round((expiration - datetime.now(timezone.utc)).total_seconds()) if expiration else None,
+            "refreshes": self.refreshes,
+            "failures": self.failures,
+            "last_error": self.last_error,
+        }
+
+
+def get_credentials_resolver() -> RefreshingCredentialsResolver:
+    """Return the process-wide resolver, started on first use."""
+    global _resolver
+    with _resolver_lock:
+        if _resolver is None:
+            _resolver = RefreshingCredentialsResolver().start()
+        return _resolver
@@ -0,0 +1,117 @@
+"""Benchmark InlineAgentOrchestrator request building and response handling.
+
+Uses a stubbed bedrock-agent-runtime client that returns a canned event
+stream, so it runs offline. Compares the previous per-call behaviour
+(re-serializing the schema, += concatenation, INFO log per chunk) with the
+pre-built request template, list join and streaming API.
+
+    python benchmarks/inline_agent_bench.py --calls 2000 --chunks 200
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+os.environ.setdefault("BOOKING_LAMBDA_ARN", "arn:aws:lambda:us-east-1:000000000000:function:booking-stub")
+
+from integration.inline_agent import InlineAgentOrchestrator, logger  # noqa: E402
+
+
+class StubAgentRuntimeClient:
+    """Returns a fixed number of chunk events for every invoke_inline_agent call."""
+    def __init__(self, chunks, chunk_text="Booking 42 for Jane Doe on 2025-07-11. "):
+        self.chunks = chunks
+        self.payload = chunk_text.encode("utf8")
+
+    def invoke_inline_agent(self, **params):
+        return {
+            "ResponseMetadata": {"HTTPStatusCode": 200},
+            "completion": ({"chunk": {"bytes": self.payload}} for _ in range(self.chunks)),
+        }
+
+
+class StubBase:
+    """Stands in for the base orchestrator whose clients and schema are shared."""
+    def __init__(self, client, schema_file):
+        self.client = client
+        self.logs_client = None
+        with open(schema_file) as f:
+            self.schema = json.load(f)
+        self.schema_payload = json.dumps(self.schema)
+
+
+def legacy_invoke(orchestrator, query):
+    """The request/response path before request templates and streaming."""
+    params = {
+        "inputText": query,
+        "foundationModel": orchestrator.config["model_id"],
+        "instruction": orchestrator._get_agent_instruction(),
+        "sessionId": orchestrator.session_id,
+        "endSession": False,
+        "enableTrace": False,
+        "actionGroups": [{
+            'actionGroupName': 'BookingAPI',
+            'actionGroupExecutor': {'lambda': orchestrator.lambda_arn},
+            'apiSchema': {'payload': json.dumps(orchestrator.schema)}
+        }]
+    }
+    agent_resp = orchestrator.client.invoke_inline_agent(**params)
+    agent_answer = ""
+    for event in agent_resp["completion"]:
+        if "chunk" in event:
+            chunk_text = event["chunk"]["bytes"].decode("utf8")
+            logger.info(f"Chunk: {chunk_text}")
+            agent_answer += chunk_text
+    return agent_answer
+
+
+def time_calls(fn, calls):
+    start = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return (time.perf_counter() - start) / calls
+
+
+def time_first_chunk(orchestrator, query, calls):
+    total = 0.0
+    for _ in range(calls):
+        start = time.perf_counter()
+        stream = orchestrator.invoke_stream(query)
+        next(stream)
+        total += time.perf_counter() - start
+        stream.close()
+    return total / calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description="InlineAgentOrchestrator invoke benchmark")
+    parser.add_argument("--calls", type=int, default=1000)
+    parser.add_argument("--chunks", type=int, default=200)
+    args = parser.parse_args()
+
+    # Keep the INFO level the module configures, but send records nowhere so
+    # the benchmark measures formatting cost rather than terminal speed.
+    logging.getLogger().handlers = [logging.StreamHandler(open(os.devnull, "w"))]
+
+    schema_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "integration", "booking_openapi.json")
+    base = StubBase(StubAgentRuntimeClient(args.chunks), schema_file)
+    orchestrator = InlineAgentOrchestrator({"schema_file": schema_file}, shared_from=base)
+    query = '{"operation": "list_bookings", "limit": 5}'
+
+    assert legacy_invoke(orchestrator, query) == orchestrator.invoke(query)
+
+    legacy = time_calls(lambda: legacy_invoke(orchestrator, query), args.calls)
+    current = time_calls(lambda: orchestrator.invoke(query), args.calls)
+    first_chunk = time_first_chunk(orchestrator, query, args.calls)
+
+    print(f"calls={args.calls} chunks/call={args.chunks}")
+    print(f"legacy invoke:        {legacy * 1e6:10.1f} us/call")
+    print(f"template invoke:      {current * 1e6:10.1f} us/call  ({legacy / current:.2f}x)")
+    print(f"stream first chunk:   {first_chunk * 1e6:10.1f} us/call")
+
+
+if __name__ == "__main__":
+    main()
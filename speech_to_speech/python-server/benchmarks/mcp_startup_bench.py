@@ -0,0 +1,99 @@
+"""Benchmark McpLocationClient startup modes against the local stub MCP server.
+
+Compares:
+  resolve  - eager connect where each process pays a resolution delay, as
+             `uvx ...@latest` does on every start
+  pinned   - eager connect to a pre-resolved server (no resolution delay)
+  lazy     - start_warm_up(): time until the server can accept connections,
+             and until the first tool call returns
+It also reports the cost of get_mcp_tools before and after caching.
+
+    python benchmarks/mcp_startup_bench.py --resolve-delay 3 --pool-size 2
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, ".."))
+
+from mcp import StdioServerParameters  # noqa: E402
+
+from integration.mcp_client import McpLocationClient  # noqa: E402
+
+STUB_SERVER = os.path.join(HERE, "stub_mcp_server.py")
+
+
+class StubLocationClient(McpLocationClient):
+    def __init__(self, startup_delay, **kwargs):
+        super().__init__(**kwargs)
+        self.startup_delay = startup_delay
+
+    def _server_params(self):
+        return StdioServerParameters(
+            command=sys.executable,
+            args=[STUB_SERVER, "--startup-delay", str(self.startup_delay)],
+            env={"FASTMCP_LOG_LEVEL": "ERROR"},
+        )
+
+
+async def eager(startup_delay, pool_size):
+    client = StubLocationClient(startup_delay, pool_size=pool_size, enable_cache=False)
+    start = time.perf_counter()
+    await client.connect_to_server()
+    ready = time.perf_counter() - start
+    await client.call_tool({"query": "zoo"})
+    first_call = time.perf_counter() - start
+    await client.cleanup()
+    return ready, first_call
+
+
+async def lazy(startup_delay, pool_size):
+    client = StubLocationClient(startup_delay, pool_size=pool_size, enable_cache=False)
+    start = time.perf_counter()
+    client.start_warm_up()
+    accepting = time.perf_counter() - start
+    await client.call_tool({"query": "zoo"})
+    first_call = time.perf_counter() - start
+    await client.cleanup()
+    return accepting, first_call
+
+
+async def list_tools(pool_size):
+    client = StubLocationClient(0, pool_size=pool_size)
+    await client.connect_to_server()
+    start = time.perf_counter()
+    await client.get_mcp_tools()
+    uncached = time.perf_counter() - start
+    start = time.perf_counter()
+    for _ in range(100):
+        await client.get_mcp_tools()
+    cached = (time.perf_counter() - start) / 100
+    await client.cleanup()
+    return uncached, cached
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="MCP startup benchmark")
+    parser.add_argument("--resolve-delay", type=float, default=3.0,
+                        help="seconds the stub sleeps before serving, emulating uvx @latest resolution")
+    parser.add_argument("--pool-size", type=int, default=2)
+    args = parser.parse_args()
+
+    resolve_ready, resolve_first = await eager(args.resolve_delay, args.pool_size)
+    pinned_ready, pinned_first = await eager(0, args.pool_size)
+    lazy_accepting, lazy_first = await lazy(args.resolve_delay, args.pool_size)
+    uncached, cached = await list_tools(args.pool_size)
+
+    print(f"pool_size={args.pool_size} resolve_delay={args.resolve_delay}s")
+    print(f"{'mode':<10}{'ready (s)':>14}{'first call (s)':>18}")
+    print(f"{'resolve':<10}{resolve_ready:>14.3f}{resolve_first:>18.3f}")
+    print(f"{'pinned':<10}{pinned_ready:>14.3f}{pinned_first:>18.3f}")
+    print(f"{'lazy':<10}{lazy_accepting:>14.3f}{lazy_first:>18.3f}")
+    print(f"list_tools: first {uncached * 1000:.2f} ms, cached {cached * 1e6:.2f} us")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,218 @@
+"""Replay a recorded session through S2sSessionManager against a stubbed Bedrock stream.
+
+Recordings come from running the server with S2S_RECORD_DIR set (see
+session_recorder.py). Client events go through handle_client_event exactly as
+the WebSocket handler sends them, and recorded Bedrock output events are fed
+back through the stream, so the manager's whole hot path runs without AWS.
+
+    python benchmarks/replay_session.py recordings/<session_id>.jsonl
+    python benchmarks/replay_session.py rec.jsonl --speed max --repeat 5 --json
+
+--speed original keeps the recorded timing (including tool durations);
+--speed max replays in recorded order as fast as possible. --tools recorded
+returns the recorded tool results instead of calling the integrations.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+from collections import deque
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, ".."))
+
+# Don't record the replay itself
+os.environ["S2S_RECORD_DIR"] = ""
+
+import session_recorder  # noqa: E402
+from s2s_session_manager import S2sSessionManager  # noqa: E402
+
+DRAIN_TIMEOUT = 10.0
+
+
+class _Payload:
+    def __init__(self, data):
+        self.bytes_ = data
+
+
+class _Result:
+    def __init__(self, data):
+        self.value = _Payload(data)
+
+
+class _Receiver:
+    def __init__(self, data):
+        self._data = data
+
+    async def receive(self):
+        return _Result(self._data)
+
+
+class ReplayInputStream:
+    """Accepts what the manager sends to Bedrock and counts it."""
+    def __init__(self):
+        self.events = 0
+        self.bytes = 0
+
+    async def send(self, event):
+        self.events += 1
+        self.bytes += len(event.value.bytes_)
+
+    async def close(self):
+        pass
+
+
+class ReplayStream:
+    def __init__(self):
+        self.input_stream = ReplayInputStream()
+        self._outputs = asyncio.Queue()
+
+    def push(self, event):
+        self._outputs.put_nowait(json.dumps(event).encode("utf-8"))
+
+    async def await_output(self):
+        return None, _Receiver(await self._outputs.get())
+
+
+class ReplayClient:
+    def __init__(self, stream):
+        self.stream = stream
+
+    async def invoke_model_with_bidirectional_stream(self, operation_input):
+        return self.stream
+
+
+def _percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+async def replay(path, speed="original", tools="recorded"):
+    header, entries = session_recorder.load(path)
+    stream = ReplayStream()
+    manager = S2sSessionManager(region="us-east-1", model_id=header.get("model_id", "amazon.nova-sonic-v1:0"),
+                                text_only=header.get("text_only", False))
+    manager.bedrock_client = ReplayClient(stream)
+
+    recorded_tools = deque(e for e in entries if e["dir"] == "tool")
+    if tools == "recorded":
+        async def recorded_tool(tool_name, tool_use_content):
+            entry = recorded_tools.popleft() if recorded_tools else {"result": {"result": "no recorded result"}}
+            if speed == "original":
+                await asyncio.sleep(entry.get("duration_ms", 0) / 1000)
+            return entry["result"]
+        manager.processToolUse = recorded_tool
+
+    pushed_at = {}
+    latencies = []
+    forwarded = 0
+
+    async def forward():
+        # Same work as server.forward_responses, minus the socket
+        nonlocal forwarded
+        while True:
+            response = await manager.output_queue.get()
+            json.dumps(response)
+            forwarded += 1
+            seq = response.pop("_replay_seq", None)
+            if seq is not None:
+                latencies.append((time.perf_counter() - pushed_at.pop(seq)) * 1000)
+
+    await manager.initialize_stream()
+    forward_task = asyncio.create_task(forward())
+
+    start = time.perf_counter()
+    cpu_start = time.process_time()
+    max_lag = 0.0
+    inbound = outbound = 0
+    for seq, entry in enumerate(entries):
+        if speed == "original":
+            delay = start + entry["t"] / 1000 - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            else:
+                max_lag = max(max_lag, -delay * 1000)
+        else:
+            await asyncio.sleep(0)
+
+        if entry["dir"] == "in":
+            event = entry["event"]
+            await manager.handle_client_event(next(iter(event["event"])), event)
+            inbound += 1
+        elif entry["dir"] == "out":
+            event = {k: v for k, v in entry["event"].items() if k != "timestamp"}
+            event["_replay_seq"] = seq
+            pushed_at[seq] = time.perf_counter()
+            stream.push(event)
+            outbound += 1
+
+    # Let the manager finish relaying what it was given
+    deadline = time.perf_counter() + DRAIN_TIMEOUT
+    while (pushed_at or not manager.audio_input_queue.empty()) and time.perf_counter() < deadline:
+        await asyncio.sleep(0.001)
+    wall = time.perf_counter() - start
+    cpu = time.process_time() - cpu_start
+
+    await manager.close()
+    forward_task.cancel()
+    try:
+        await forward_task
+    except asyncio.CancelledError:
+        pass
+
+    return {
+        "recording": os.path.basename(path),
+        "speed": speed,
+        "tools": tools,
+        "recorded_ms": entries[-1]["t"] if entries else 0,
+        "wall_ms": round(wall * 1000, 1),
+        "cpu_ms": round(cpu * 1000, 1),
+        "inbound_events": inbound,
+        "outbound_events": outbound,
+        "sent_to_bedrock": stream.input_stream.events,
+        "forwarded_to_client": forwarded,
+        "unrelayed": len(pushed_at),
+        "relay_p50_ms": round(_percentile(latencies, 0.5), 3),
+        "relay_p99_ms": round(_percentile(latencies, 0.99), 3),
+        "relay_max_ms": round(max(latencies, default=0.0), 3),
+        "max_schedule_lag_ms": round(max_lag, 3),
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Replay a recorded S2S session")
+    parser.add_argument("recording")
+    parser.add_argument("--speed", choices=["original", "max"], default="original")
+    parser.add_argument("--tools", choices=["recorded", "live"], default="recorded")
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--json", action="store_true", help="print one JSON result per run")
+    args = parser.parse_args()
+
+    runs = []
+    for _ in range(args.repeat):
+        result = await replay(args.recording, args.speed, args.tools)
+        runs.append(result)
+        if args.json:
+            print(json.dumps(result))
+    if args.json:
+        return
+
+    first = runs[0]
+    print(f"{first['recording']}: {first['inbound_events']} in / {first['outbound_events']} out, "
+          f"recorded {first['recorded_ms'] / 1000:.1f}s, speed={args.speed}, tools={args.tools}")
+    print(f"{'run':<5}{'wall (ms)':>11}{'cpu (ms)':>10}{'relay p50':>11}{'relay p99':>11}{'max lag':>10}")
+    for i, r in enumerate(runs, 1):
+        print(f"{i:<5}{r['wall_ms']:>11.1f}{r['cpu_ms']:>10.1f}{r['relay_p50_ms']:>11.3f}"
+              f"{r['relay_p99_ms']:>11.3f}{r['max_schedule_lag_ms']:>10.1f}")
+    if len(runs) > 1:
+        print(f"median cpu {statistics.median(r['cpu_ms'] for r in runs):.1f} ms, "
+              f"median relay p99 {statistics.median(r['relay_p99_ms'] for r in runs):.3f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,54 @@
+"""Local stand-in for awslabs.aws-location-mcp-server.
+
+Exposes the same tool names over stdio with canned results so MCP startup
+and dispatch can be benchmarked offline.
+
+    python benchmarks/stub_mcp_server.py [--startup-delay SECONDS] [--call-delay SECONDS]
+
+--startup-delay emulates the package resolution uvx performs before the
+server starts (e.g. for @latest).
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from mcp.server.fastmcp import FastMCP
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--startup-delay", type=float, default=0.0)
+parser.add_argument("--call-delay", type=float, default=0.0)
+args = parser.parse_args()
+
+time.sleep(args.startup_delay)
+mcp = FastMCP("stub-aws-location")
+
+
+async def _respond(tool, query):
+    if args.call_delay:
+        await asyncio.sleep(args.call_delay)
+    return json.dumps({"tool": tool, "query": query, "places": [{"name": "Stub Place", "coordinates": [-122.35, 47.62]}]})
+
+
+@mcp.tool()
+async def search_places(query: str) -> str:
+    return await _respond("search_places", query)
+
+
+@mcp.tool()
+async def get_place(query: str) -> str:
+    return await _respond("get_place", query)
+
+
+@mcp.tool()
+async def search_nearby(query: str) -> str:
+    return await _respond("search_nearby", query)
+
+
+@mcp.tool()
+async def reverse_geocode(query: str) -> str:
+    return await _respond("reverse_geocode", query)
+
+
+if __name__ == "__main__":
+    mcp.run()
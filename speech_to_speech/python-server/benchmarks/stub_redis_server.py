@@ -0,0 +1,145 @@
+"""Local stand-in for Redis, covering the commands shared_state.RedisBackend uses.
+
+Speaks RESP2 over TCP and keeps data in memory, so several S2S server
+processes can share state offline:
+
+    python benchmarks/stub_redis_server.py --port 6390
+    SHARED_STATE_URL=redis://127.0.0.1:6390/0 python server.py
+
+Supported: PING, GET, SET (EX/PX), DEL, INCRBY, INCR, SADD, SREM, SMEMBERS,
+FLUSHALL, plus the HELLO/CLIENT/SELECT connection handshake.
+"""
+import argparse
+import asyncio
+import time
+
+
+class StubRedis:
+    def __init__(self):
+        self.values = {}
+        self.expires = {}
+
+    def _live(self, key):
+        expires_at = self.expires.get(key)
+        if expires_at is not None and expires_at < time.monotonic():
+            self.values.pop(key, None)
+            self.expires.pop(key, None)
+        return key in self.values
+
+    def execute(self, args):
+        command = args[0].upper()
+        if command == b"PING":
+            return "+PONG"
+        if command == b"HELLO":
+            # RESP3 clients negotiate here; only nulls and this map differ from RESP2
+            proto = int(args[1]) if len(args) > 1 else 2
+            return {b"server": b"redis", b"version": b"7.0.0", b"proto": proto, b"mode": b"standalone"}
+        if command in (b"CLIENT", b"SELECT"):
+            return "+OK"
+        if command == b"FLUSHALL":
+            self.values.clear()
+            self.expires.clear()
+            return "+OK"
+        if command == b"GET":
+            return self.values[args[1]] if self._live(args[1]) else None
+        if command == b"SET":
+            key, value = args[1], args[2]
+            self.values[key] = value
+            self.expires.pop(key, None)
+            options = [a.upper() for a in args[3:]]
+            for flag, scale in ((b"EX", 1.0), (b"PX", 0.001)):
+                if flag in options:
+                    ttl = float(args[3 + options.index(flag) + 1]) * scale
+                    self.expires[key] = time.monotonic() + ttl
+            return "+OK"
+        if command == b"DEL":
+            removed = 0
+            for key in args[1:]:
+                if self._live(key):
+                    removed += 1
+                self.values.pop(key, None)
+                self.expires.pop(key, None)
+            return removed
+        if command in (b"INCR", b"INCRBY"):
+            amount = int(args[2]) if command == b"INCRBY" else 1
+            value = int(self.values[args[1]]) if self._live(args[1]) else 0
+            value += amount
+            self.values[args[1]] = str(value).encode()
+            return value
+        if command in (b"SADD", b"SREM"):
+            if not self._live(args[1]):
+                self.values[args[1]] = set()
+            members = self.values[args[1]]
+            before = len(members)
+            for member in args[2:]:
+                (members.add if command == b"SADD" else members.discard)(member)
+            return abs(len(members) - before)
+        if command == b"SMEMBERS":
+            return list(self.values[args[1]]) if self._live(args[1]) else []
+        return f"-ERR unknown command '{command.decode()}'"
+
+
+def encode(reply, proto=2):
+    if reply is None:
+        return b"_\r\n" if proto == 3 else b"$-1\r\n"
+    if isinstance(reply, str):
+        return f"{reply}\r\n".encode()
+    if isinstance(reply, int):
+        return f":{reply}\r\n".encode()
+    if isinstance(reply, bytes):
+        return b"$%d\r\n%s\r\n" % (len(reply), reply)
+    if isinstance(reply, dict):
+        return b"%%%d\r\n" % len(reply) + b"".join(encode(k, proto) + encode(v, proto) for k, v in reply.items())
+    return b"*%d\r\n" % len(reply) + b"".join(encode(item, proto) for item in reply)
+
+
+async def read_command(reader):
+    line = await reader.readline()
+    if not line:
+        return None
+    if not line.startswith(b"*"):
+        return line.strip().split()  # inline command
+    args = []
+    for _ in range(int(line[1:])):
+        length = int((await reader.readline())[1:])
+        args.append((await reader.readexactly(length + 2))[:-2])
+    return args
+
+
+async def serve(host="127.0.0.1", port=6390):
+    """Start the stand-in and return the asyncio server."""
+    store = StubRedis()
+
+    async def handle(reader, writer):
+        proto = 2
+        try:
+            while True:
+                args = await read_command(reader)
+                if not args:
+                    break
+                reply = store.execute(args)
+                if isinstance(reply, dict):
+                    proto = reply[b"proto"]
+                writer.write(encode(reply, proto))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, host, port)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Stub Redis server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6390)
+    args = parser.parse_args()
+    server = await serve(args.host, args.port)
+    print(f"Stub Redis listening on redis://{args.host}:{args.port}/0")
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,65 @@
+"""Local stand-in for the open-meteo forecast API.
+
+Serves canned current_weather JSON on /v1/forecast so the Strands weather
+tool can run offline. Point the tool at it with
+OPEN_METEO_URL=http://127.0.0.1:<port>/v1/forecast.
+
+    python benchmarks/stub_weather_server.py [--port 8765] [--delay SECONDS]
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+class StubWeatherHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+    delay = 0.0
+    requests_served = 0
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path != "/v1/forecast":
+            self.send_error(404)
+            return
+        query = parse_qs(url.query)
+        if self.delay:
+            time.sleep(self.delay)
+        type(self).requests_served += 1
+        body = json.dumps({
+            "latitude": float(query.get("latitude", ["0"])[0]),
+            "longitude": float(query.get("longitude", ["0"])[0]),
+            "current_weather": {"time": "2025-07-11T12:30", "interval": 900, "temperature": 21.6,
+                                "windspeed": 6.1, "winddirection": 360, "is_day": 1, "weathercode": 2},
+        }).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub_server(port=0, delay=0.0):
+    """Start the stub in a daemon thread and return (server, base_url)."""
+    StubWeatherHandler.delay = delay
+    server = ThreadingHTTPServer(("127.0.0.1", port), StubWeatherHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v1/forecast"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stub open-meteo server")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--delay", type=float, default=0.0)
+    args = parser.parse_args()
+    server, url = start_stub_server(args.port, args.delay)
+    print(f"Stub weather API at {url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
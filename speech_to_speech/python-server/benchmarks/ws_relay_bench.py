@@ -0,0 +1,171 @@
+"""Benchmark the WebSocket audio relay with and without loop_tuning settings.
+
+Each configuration starts a relay server in a subprocess that does the same
+per-message work as server.websocket_handler and S2sSessionManager (JSON
+parse, queue, re-encode the Bedrock input event, forward an output event of
+similar size), minus the Bedrock call itself. Clients stream 32 ms chunks of
+16 kHz PCM in real time and the server's CPU time is used to estimate how
+many sessions one core can sustain.
+
+    python benchmarks/ws_relay_bench.py --sessions 50 --duration 10
+
+The "tuned" run uses EVENT_LOOP=uvloop (if installed), WS_COMPRESSION=none,
+WS_MAX_SIZE=262144 and WS_WRITE_LIMIT=131072.
+"""
+import argparse
+import asyncio
+import base64
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, ".."))
+
+import websockets  # noqa: E402
+
+from loop_tuning import install_event_loop, websocket_options  # noqa: E402
+
+CHUNK_BYTES = 1024  # 32 ms of 16 kHz 16-bit mono PCM
+CHUNK_INTERVAL = 0.032
+OUTPUT_RATIO = 1.5  # Nova Sonic speaks 24 kHz audio
+
+CONFIGS = {
+    "default": {},
+    "tuned": {
+        "EVENT_LOOP": "uvloop",
+        "WS_COMPRESSION": "none",
+        "WS_MAX_SIZE": "262144",
+        "WS_WRITE_LIMIT": "131072",
+    },
+}
+
+
+async def relay_handler(websocket):
+    audio_queue = asyncio.Queue()
+    output_queue = asyncio.Queue()
+
+    async def process_audio():
+        output_content = base64.b64encode(b"\0" * int(CHUNK_BYTES * OUTPUT_RATIO)).decode("utf-8")
+        while True:
+            data = await audio_queue.get()
+            # What _process_audio_input serializes for Bedrock
+            json.dumps({"event": {"audioInput": data}})
+            output_queue.put_nowait({"event": {"audioOutput": {
+                "content": output_content, "sentAt": data["sentAt"]}}})
+
+    async def forward():
+        while True:
+            response = await output_queue.get()
+            await websocket.send(json.dumps(response))
+
+    tasks = [asyncio.create_task(process_audio()), asyncio.create_task(forward())]
+    try:
+        async for message in websocket:
+            data = json.loads(message)
+            if "stats" in data:
+                await websocket.send(json.dumps({"cpu": time.process_time()}))
+                continue
+            event_type = list(data["event"].keys())[0]
+            if event_type == "audioInput":
+                event = data["event"]["audioInput"]
+                audio_queue.put_nowait({
+                    "promptName": event["promptName"],
+                    "contentName": event["contentName"],
+                    "content": event["content"],
+                    "sentAt": event["sentAt"],
+                })
+    except websockets.exceptions.ConnectionClosed:
+        pass
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def serve(port):
+    options = websocket_options()
+    async with websockets.serve(relay_handler, "127.0.0.1", port, **options):
+        print("READY", flush=True)
+        await asyncio.Future()
+
+
+async def client_session(port, duration, latencies):
+    content = base64.b64encode(os.urandom(CHUNK_BYTES)).decode("utf-8")
+    async with websockets.connect(f"ws://127.0.0.1:{port}", max_size=None) as websocket:
+        async def receive():
+            async for message in websocket:
+                sent_at = json.loads(message)["event"]["audioOutput"]["sentAt"]
+                latencies.append(time.perf_counter() - sent_at)
+
+        receiver = asyncio.create_task(receive())
+        deadline = time.perf_counter() + duration
+        next_send = time.perf_counter()
+        while next_send < deadline:
+            await websocket.send(json.dumps({"event": {"audioInput": {
+                "promptName": "p", "contentName": "c", "content": content,
+                "sentAt": time.perf_counter()}}}))
+            next_send += CHUNK_INTERVAL
+            await asyncio.sleep(max(0.0, next_send - time.perf_counter()))
+        await asyncio.sleep(0.2)
+        receiver.cancel()
+
+
+async def server_cpu(port):
+    async with websockets.connect(f"ws://127.0.0.1:{port}") as websocket:
+        await websocket.send(json.dumps({"stats": {}}))
+        return json.loads(await websocket.recv())["cpu"]
+
+
+async def run_config(name, sessions, duration, port):
+    env = {**os.environ, **CONFIGS[name]}
+    server = subprocess.Popen([sys.executable, __file__, "--serve", "--port", str(port)],
+                              env=env, stdout=subprocess.PIPE, text=True)
+    try:
+        loop_line = server.stdout.readline().strip()
+        server.stdout.readline()  # READY
+        latencies = []
+        cpu_start = await server_cpu(port)
+        wall_start = time.perf_counter()
+        await asyncio.gather(*(client_session(port, duration, latencies) for _ in range(sessions)))
+        wall = time.perf_counter() - wall_start
+        cpu = await server_cpu(port) - cpu_start
+    finally:
+        server.terminate()
+        server.wait()
+    latencies.sort()
+    return {
+        "config": name,
+        "loop": loop_line.split()[-1],
+        "cpu_util": cpu / wall,
+        "sessions_per_core": sessions * wall / cpu if cpu else float("inf"),
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+
+async def main(args):
+    results = []
+    for offset, name in enumerate(CONFIGS):
+        results.append(await run_config(name, args.sessions, args.duration, args.port + offset))
+    print(f"sessions={args.sessions} duration={args.duration}s chunk={CHUNK_BYTES}B every {CHUNK_INTERVAL * 1000:.0f} ms")
+    print(f"{'config':<10}{'loop':<10}{'server cpu':>12}{'sessions/core':>16}{'p50 (ms)':>11}{'p99 (ms)':>11}")
+    for r in results:
+        print(f"{r['config']:<10}{r['loop']:<10}{r['cpu_util']:>11.1%}{r['sessions_per_core']:>16.0f}"
+              f"{r['p50_ms']:>11.2f}{r['p99_ms']:>11.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="WebSocket relay benchmark")
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--port", type=int, default=8191)
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.serve:
+        print(f"LOOP {install_event_loop()}", flush=True)
+        asyncio.run(serve(args.port))
+    else:
+        asyncio.run(main(args))
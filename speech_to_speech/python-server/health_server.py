@@ -0,0 +1,92 @@
+"""Minimal asyncio HTTP server for load balancer health probes and metrics.
+
+Runs on the same event loop as the WebSocket server, so probes are answered
+without a separate thread and handlers can read server state directly.
+Only GET is supported and every response closes the connection. Routes are
+called with the parsed query string as a dict.
+"""
+import asyncio
+import json
+import logging
+from http import HTTPStatus
+from typing import Awaitable, Callable, Dict, Tuple, Union
+from urllib.parse import parse_qsl
+
+logger = logging.getLogger(__name__)
+
+REQUEST_TIMEOUT = 5.0
+MAX_HEADER_LINES = 100
+
+# A route returns (status, body); dict bodies are sent as JSON, str bodies as plain text
+RouteResult = Tuple[HTTPStatus, Union[dict, str]]
+Route = Callable[[Dict[str, str]], Union[RouteResult, Awaitable[RouteResult]]]
+
+
+class HealthServer:
+    def __init__(self, host: str, port: int, routes: Dict[str, Route]):
+        self.host = host
+        self.port = port
+        self.routes = routes
+        self.requests = 0
+        self._server = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        logger.info(f"Health check server started at http://{self.host}:{self.port}/health")
+        return self
+
+    async def close(self):
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _handle(self, reader, writer):
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), REQUEST_TIMEOUT)
+            # Drain the headers; none of the routes need them
+            for _ in range(MAX_HEADER_LINES):
+                line = await asyncio.wait_for(reader.readline(), REQUEST_TIMEOUT)
+                if line in (b"\r\n", b"\n", b""):
+                    break
+            parts = request_line.decode("latin-1").split()
+            if len(parts) < 2:
+                return
+            method, target = parts[0], parts[1]
+            path, _, query = target.partition("?")
+            self.requests += 1
+            status, body = await self._dispatch(method, path, dict(parse_qsl(query)))
+            logger.debug(f"{method} {path} -> {status.value}")
+            await self._respond(writer, status, body, head_only=method == "HEAD")
+        except (asyncio.TimeoutError, ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except Exception as ex:
+            logger.error(f"Health check request failed: {ex}")
+        finally:
+            writer.close()
+
+    async def _dispatch(self, method, path, query) -> RouteResult:
+        if method not in ("GET", "HEAD"):
+            return HTTPStatus.METHOD_NOT_ALLOWED, {"error": "method not allowed"}
+        route = self.routes.get(path)
+        if route is None:
+            return HTTPStatus.NOT_FOUND, {"error": "not found"}
+        result = route(query)
+        if asyncio.iscoroutine(result):
+            result = await result
+        return result
+
+    @staticmethod
+    async def _respond(writer, status, body, head_only=False):
+        if isinstance(body, dict):
+            payload, content_type = json.dumps(body).encode("utf-8"), "application/json"
+        else:
+            payload, content_type = str(body).encode("utf-8"), "text/plain; version=0.0.4"
+        headers = (
+            f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(payload)}\r\n"
+            "Connection: close\r\n\r\n"
+        )
+        writer.write(headers.encode("latin-1") + (b"" if head_only else payload))
+        await writer.drain()
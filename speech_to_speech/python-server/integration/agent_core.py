@@ -1,33 +1,52 @@
 import boto3
 import json
 import os
+import threading
+
+from integration.tracing import inject_headers, set_attributes, traced
 
 region = os.environ.get("AWS_DEFAULT_REGION", "us-east-1")
 
 ARNS = {}
-if len(ARNS.keys()) == 0:
-    # Get AgentCore Runtime ARNS
-    agentcore_control = boto3.client('bedrock-agentcore-control', region)
-    rt_response= agentcore_control.list_agent_runtimes()
-    for rt in rt_response["agentRuntimes"]:
-        agent_rt_name = rt["agentRuntimeName"]
-        ARNS[agent_rt_name] = rt["agentRuntimeArn"]
+agentcore_client = None
+_init_lock = threading.Lock()
+
+
+def _ensure_client():
+    """Look up the AgentCore Runtime ARNs and create the client on first use, not at import."""
+    global agentcore_client
+    with _init_lock:
+        if len(ARNS.keys()) == 0:
+            # Get AgentCore Runtime ARNS
+            agentcore_control = boto3.client('bedrock-agentcore-control', region)
+            rt_response= agentcore_control.list_agent_runtimes()
+            for rt in rt_response["agentRuntimes"]:
+                agent_rt_name = rt["agentRuntimeName"]
+                ARNS[agent_rt_name] = rt["agentRuntimeArn"]
+        if agentcore_client is None:
+            agentcore_client = boto3.client('bedrock-agentcore',region_name=region)
 
-agentcore_client = boto3.client('bedrock-agentcore',region_name=region)
+# W3C trace headers and the InvokeAgentRuntime parameters that carry them
+TRACE_PARAMS = {"traceparent": "traceParent", "tracestate": "traceState", "baggage": "baggage"}
 
+@traced("agent_core.invoke_agent_core")
 def invoke_agent_core(tool_name, payload):
     try:
-        global ARNS
+        _ensure_client()
         arn = ARNS.get(tool_name.lower())
         if not arn:
             return {"result": "AgentCore runtime doesn't exist"}
+        set_attributes(tool_name=tool_name, agent_runtime_arn=arn)
         if isinstance(payload, dict):
             payload = json.dumps({"account_id":"940y22688","query":"account balance"})
 
+        # Continue this trace inside the AgentCore runtime
+        trace_params = {TRACE_PARAMS[k]: v for k, v in inject_headers().items() if k in TRACE_PARAMS}
         boto3_response = agentcore_client.invoke_agent_runtime(
             agentRuntimeArn=arn,
             qualifier="DEFAULT",
-            payload=json.dumps(payload)
+            payload=json.dumps(payload),
+            **trace_params
         )
 
         if "text/event-stream" in boto3_response.get("contentType", ""):
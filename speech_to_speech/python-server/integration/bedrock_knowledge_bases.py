@@ -1,11 +1,15 @@
+import asyncio
 import json
 import boto3
 import os
 
+from integration.tracing import traced
+
 KB_ID = os.environ.get('KB_ID')
 KB_REGION = os.environ.get('KB_REGION', 'us-east-1')
 bedrock_agent_runtime = boto3.client('bedrock-agent-runtime', region_name=KB_REGION) 
 
+@traced("kb.retrieve_kb")
 def retrieve_kb(query):
     results = []
     # Call KB
@@ -26,9 +30,7 @@ def retrieve_kb(query):
             results.append(r["content"]["text"])
     return results
 
-def retrieve_and_generation(query):
-    results = []
-    custom_prompt = """
+CUSTOM_PROMPT = """
       You are a question answering agent. I will provide you with a set of search results.
       The user will provide you with a question. Your job is to answer the user's question using only information from the search results. 
       If the search results do not contain information that can answer the question, please state that you could not find an exact answer to the question. 
@@ -39,29 +41,63 @@ def retrieve_and_generation(query):
 
       $output_format_instructions$
       """
-    response = bedrock_agent_runtime.retrieve_and_generate(
-            input={
-                'text': query
-            },
-        retrieveAndGenerateConfiguration={
-        'type': 'KNOWLEDGE_BASE',
-        'knowledgeBaseConfiguration': {
-            'knowledgeBaseId': KB_ID,
-            'modelArn': 'anthropic.claude-3-haiku-20240307-v1:0', 
-            'retrievalConfiguration': {
-                'vectorSearchConfiguration': {
-                    'numberOfResults': 2 # will fetch top N documents which closely match the query
+
+def _retrieve_and_generate_params(query):
+    return {
+        'input': {
+            'text': query
+        },
+        'retrieveAndGenerateConfiguration': {
+            'type': 'KNOWLEDGE_BASE',
+            'knowledgeBaseConfiguration': {
+                'knowledgeBaseId': KB_ID,
+                'modelArn': 'anthropic.claude-3-haiku-20240307-v1:0', 
+                'retrievalConfiguration': {
+                    'vectorSearchConfiguration': {
+                        'numberOfResults': 2 # will fetch top N documents which closely match the query
                     }
                 },
                 'generationConfiguration': {
-                        'promptTemplate': {
-                            'textPromptTemplate': custom_prompt
-                        }
+                    'promptTemplate': {
+                        'textPromptTemplate': CUSTOM_PROMPT
                     }
+                }
             }
         }
-    )
+    }
+
+def retrieve_and_generation(query):
+    results = []
+    response = bedrock_agent_runtime.retrieve_and_generate(**_retrieve_and_generate_params(query))
     if "citations" in response:
         for r in response["citations"]:
             results.append(r["generatedResponsePart"]["textResponsePart"]["text"])
-    return results
\ No newline at end of file
+    return results
+
+async def retrieve_and_generation_stream(query):
+    """Stream a retrieve-and-generate answer as it is produced.
+
+    Yields {"type": "text", "text": ...} for each generated fragment and
+    {"type": "citation", "text": ..., "references": [...]} for each citation,
+    in the order Bedrock emits them. The boto3 event stream is blocking, so
+    each event is pulled on a worker thread to keep the event loop free.
+    """
+    response = await asyncio.to_thread(
+        bedrock_agent_runtime.retrieve_and_generate_stream,
+        **_retrieve_and_generate_params(query)
+    )
+    events = iter(response["stream"])
+    while True:
+        event = await asyncio.to_thread(next, events, None)
+        if event is None:
+            break
+        if "output" in event:
+            yield {"type": "text", "text": event["output"]["text"]}
+        elif "citation" in event:
+            citation = event["citation"].get("citation", event["citation"])
+            part = citation.get("generatedResponsePart", {}).get("textResponsePart", {})
+            yield {
+                "type": "citation",
+                "text": part.get("text", ""),
+                "references": citation.get("retrievedReferences", [])
+            }
@@ -0,0 +1,117 @@
+# booking_formatter.py
+"""Render BookingAPI responses (see booking_openapi.json) as speech-friendly text.
+
+format_booking_result returns None for shapes it does not recognise so the
+caller can decide whether to fall back to the inline agent for formatting.
+"""
+import os
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+# Ask the inline agent to format booking shapes this module cannot render.
+LLM_FALLBACK = os.getenv("BOOKING_LLM_FORMAT_FALLBACK", "false").lower() == "true"
+MAX_SPOKEN_BOOKINGS = int(os.getenv("BOOKING_MAX_SPOKEN", "5"))
+
+_MONTHS = ["January", "February", "March", "April", "May", "June", "July",
+           "August", "September", "October", "November", "December"]
+_WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+
+def format_date(value: Any) -> str:
+    """Turn an ISO 8601 date-time into e.g. 'Friday, July 11 at 6:30 PM'."""
+    if not isinstance(value, str) or not value:
+        return str(value)
+    try:
+        dt = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return value
+    spoken = f"{_WEEKDAYS[dt.weekday()]}, {_MONTHS[dt.month - 1]} {dt.day}"
+    if dt.year != datetime.now().year:
+        spoken += f", {dt.year}"
+    if "T" in value or " " in value:
+        hour = dt.hour % 12 or 12
+        suffix = "AM" if dt.hour < 12 else "PM"
+        spoken += f" at {hour}:{dt.minute:02d} {suffix}" if dt.minute else f" at {hour} {suffix}"
+    return spoken
+
+
+def format_booking(booking: Dict[str, Any]) -> str:
+    """Describe a single Booking object in one sentence."""
+    parts = []
+    if booking.get("service_type"):
+        parts.append(f"a {booking['service_type']} booking")
+    else:
+        parts.append("a booking")
+    if booking.get("customer_name"):
+        parts.append(f"for {booking['customer_name']}")
+    if booking.get("booking_date"):
+        parts.append(f"on {format_date(booking['booking_date'])}")
+    sentence = " ".join(parts)
+    if booking.get("booking_id"):
+        sentence += f", booking ID {_spell_id(booking['booking_id'])}"
+    if booking.get("status"):
+        sentence += f", status {booking['status']}"
+    sentence = sentence[0].upper() + sentence[1:] + "."
+    if booking.get("notes"):
+        sentence += f" Notes: {booking['notes']}."
+    return sentence
+
+
+def format_booking_list(bookings: List[Dict[str, Any]], count: Optional[int] = None) -> str:
+    """Describe a BookingList, reading out at most MAX_SPOKEN_BOOKINGS entries."""
+    total = count if isinstance(count, int) else len(bookings)
+    if total == 0 or not bookings:
+        return "I couldn't find any bookings."
+    if total == 1:
+        lines = ["I found one booking."]
+    else:
+        lines = [f"I found {total} bookings."]
+    spoken = bookings[:MAX_SPOKEN_BOOKINGS]
+    for i, booking in enumerate(spoken, start=1):
+        lines.append(f"{i}. {format_booking(booking)}" if len(spoken) > 1 else format_booking(booking))
+    if total > len(spoken):
+        lines.append(f"There are {total - len(spoken)} more. Would you like to hear them?")
+    elif total > 1:
+        lines.append("Which one would you like to work with?")
+    return " ".join(lines)
+
+
+def format_booking_result(data: Any) -> Optional[str]:
+    """Render any BookingAPI response shape, or return None if the shape is unknown."""
+    if not isinstance(data, dict):
+        return None
+    if "bookings" in data:
+        bookings = data["bookings"]
+        if not isinstance(bookings, list) or not all(isinstance(b, dict) for b in bookings):
+            return None
+        return format_booking_list(bookings, data.get("count"))
+    if "error" in data:
+        return f"Sorry, there was a problem with the booking request: {data['error']}."
+    if "updated_attributes" in data:
+        updated = data["updated_attributes"]
+        if not isinstance(updated, dict):
+            return None
+        changes = ", ".join(
+            f"{key.replace('_', ' ')} to {format_date(val) if key == 'booking_date' else val}"
+            for key, val in updated.items()
+        )
+        return f"The booking was updated: {changes}." if changes else _sentence(data.get("message"), "The booking was updated.")
+    if "message" in data and "booking_id" in data and len(data) == 2:
+        return f"{_sentence(data['message'])} The booking ID is {_spell_id(data['booking_id'])}."
+    if "message" in data and len(data) == 1:
+        return _sentence(data["message"])
+    if "booking_id" in data:
+        return format_booking(data)
+    return None
+
+
+def _sentence(text: Any, default: str = "The booking request was completed.") -> str:
+    text = str(text or "").strip()
+    if not text:
+        return default
+    return text if text.endswith((".", "!", "?")) else f"{text}."
+
+
+def _spell_id(booking_id: Any) -> str:
+    # Short alphanumeric IDs are read more reliably character by character.
+    return " ".join(str(booking_id))
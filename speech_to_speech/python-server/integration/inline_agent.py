@@ -7,8 +7,13 @@ import time
 import logging
 from datetime import datetime
 import asyncio
+from collections import OrderedDict
 from threading import Lock
-from typing import Any, Dict, Optional
+from types import MappingProxyType
+from typing import Any, AsyncIterator, Dict, Iterator, Mapping, Optional
+
+from integration.log_tailer import fetch_events, format_event, get_tailer
+from integration.tracing import traced
 
 # --- Constants ---
 DEFAULT_REGION = os.getenv("AWS_REGION", "us-east-1")
@@ -16,6 +21,8 @@ DEFAULT_MODEL_ID = os.getenv("FOUNDATION_MODEL", "amazon.nova-lite-v1:0")
 DEFAULT_SCHEMA_FILE = "./integration/booking_openapi.json"
 DEFAULT_LOG_WAIT_TIME = 2
 LAMBDA_ARN_ENV = "BOOKING_LAMBDA_ARN"
+DEFAULT_POOL_SIZE = int(os.getenv("INLINE_AGENT_POOL_SIZE", "64"))
+DEFAULT_POOL_IDLE_TTL = float(os.getenv("INLINE_AGENT_POOL_IDLE_TTL", "900"))
 
 # --- Logging Setup ---
 logging.basicConfig(
@@ -27,20 +34,34 @@ logger = logging.getLogger("inline_agent")
 # --- Global Orchestrator Instance and Lock ---
 _orchestrator: Optional["InlineAgentOrchestrator"] = None
 _orchestrator_lock = Lock()
+_orchestrator_pool: Optional["InlineAgentOrchestratorPool"] = None
 
 class InlineAgentOrchestrator:
     """Orchestrates interactions with Amazon Bedrock Inline Agents for booking management."""
-    def __init__(self, config: Optional[Dict[str, Any]] = None) -> None:
+    def __init__(self, config: Optional[Dict[str, Any]] = None, shared_from: Optional["InlineAgentOrchestrator"] = None) -> None:
+        """Create an orchestrator with its own Bedrock session.
+
+        When shared_from is given, the boto3 clients and parsed schema of that
+        orchestrator are reused instead of being created again.
+        """
         self.config = self._get_default_config()
         if config:
             self.config.update(config)
-        self._validate_config()
-        self.client = boto3.client('bedrock-agent-runtime', region_name=self.config["region"])
-        self.logs_client = boto3.client('logs', region_name=self.config["region"])
-        self.schema = self._load_schema(self.config["schema_file"])
+        if shared_from is not None:
+            self.client = shared_from.client
+            self.logs_client = shared_from.logs_client
+            self.schema = shared_from.schema
+            self.schema_payload = shared_from.schema_payload
+        else:
+            self._validate_config()
+            self.client = boto3.client('bedrock-agent-runtime', region_name=self.config["region"])
+            self.logs_client = boto3.client('logs', region_name=self.config["region"])
+            self.schema = self._load_schema(self.config["schema_file"])
+            self.schema_payload = json.dumps(self.schema)
         self.lambda_arn = self._get_lambda_arn()
         self.lambda_name = self.lambda_arn.split(':')[-1]
         self.session_id = str(uuid.uuid4())
+        self.request_template = self._build_request_template()
         self.lambda_log_group = f"/aws/lambda/{self.lambda_name}"
         logger.info(f"Session initialized: {self.session_id}")
 
@@ -79,33 +100,37 @@ class InlineAgentOrchestrator:
         return lambda_arn
 
     def invoke(self, query: str) -> str:
+        return "".join(self.invoke_stream(query))
+
+    def invoke_stream(self, query: str) -> Iterator[str]:
+        """Invoke the agent and yield answer chunks as soon as Bedrock returns them."""
         try:
-            time_before_call = datetime.now()
             logger.info(f"Invoking agent with query: {query}")
-            logger.info(f"Session ID: {self.session_id}")
-            request_params = self._prepare_request_params(query)
-            logger.info("Sending request to Bedrock inline agent")
-            agent_resp = self.client.invoke_inline_agent(**request_params)
-            agent_answer = self._process_response(agent_resp)
-            return agent_answer
+            logger.debug(f"Session ID: {self.session_id}")
+            agent_resp = self.client.invoke_inline_agent(**self._prepare_request_params(query))
         except Exception as e:
             logger.error(f"Error invoking agent: {str(e)}", exc_info=True)
-            return f"Error invoking agent: {str(e)}"
+            yield f"Error invoking agent: {str(e)}"
+            return
+        yield from self._stream_response(agent_resp)
 
-    def _prepare_request_params(self, query: str) -> Dict[str, Any]:
-        return {
-            "inputText": query,
+    def _build_request_template(self) -> Mapping[str, Any]:
+        """Build the per-orchestrator request parameters once; only inputText changes per call."""
+        return MappingProxyType({
             "foundationModel": self.config["model_id"],
             "instruction": self._get_agent_instruction(),
             "sessionId": self.session_id,
             "endSession": False,
             "enableTrace": False,
-            "actionGroups": [{
+            "actionGroups": ({
                 'actionGroupName': 'BookingAPI',
                 'actionGroupExecutor': {'lambda': self.lambda_arn},
-                'apiSchema': {'payload': json.dumps(self.schema)}
-            }]
-        }
+                'apiSchema': {'payload': self.schema_payload}
+            },)
+        })
+
+    def _prepare_request_params(self, query: str) -> Dict[str, Any]:
+        return {"inputText": query, **self.request_template}
 
     @staticmethod
     def _get_agent_instruction() -> str:
@@ -134,76 +159,151 @@ class InlineAgentOrchestrator:
         )
 
     def _process_response(self, agent_resp: Dict[str, Any]) -> str:
+        return "".join(self._stream_response(agent_resp))
+
+    def _stream_response(self, agent_resp: Dict[str, Any]) -> Iterator[str]:
         if agent_resp["ResponseMetadata"]["HTTPStatusCode"] != 200:
             logger.error(f"API Response was not 200: {agent_resp}")
-            return f"API Response was not 200: {agent_resp}"
-        agent_answer = ""
+            yield f"API Response was not 200: {agent_resp}"
+            return
         event_stream = agent_resp["completion"]
         try:
             for event in event_stream:
                 if "chunk" in event:
                     chunk_text = event["chunk"]["bytes"].decode("utf8")
-                    logger.info(f"Chunk: {chunk_text}")
-                    agent_answer += chunk_text
-            return agent_answer
+                    logger.debug(f"Chunk: {chunk_text}")
+                    yield chunk_text
         except Exception as e:
             logger.error(f"Caught exception while processing response from invokeAgent:", exc_info=True)
-            return f"Error processing agent response: {str(e)}"
+            yield f"Error processing agent response: {str(e)}"
 
     def get_lambda_logs(self, start_time: datetime) -> str:
+        """Return Lambda log lines written since start_time, across all log streams."""
         try:
-            start_time_ms = int(start_time.timestamp() * 1000)
-            end_time_ms = int(datetime.now().timestamp() * 1000)
-            response = self.logs_client.describe_log_streams(
-                logGroupName=self.lambda_log_group,
-                orderBy='LastEventTime',
-                descending=True,
-                limit=5
-            )
-            log_streams = response.get('logStreams', [])
-            if not log_streams:
-                return "No log streams found for Lambda function"
-            log_stream_name = log_streams[0]['logStreamName']
-            logs_response = self.logs_client.get_log_events(
-                logGroupName=self.lambda_log_group,
-                logStreamName=log_stream_name,
-                startTime=start_time_ms,
-                endTime=end_time_ms,
-                limit=100
-            )
-            log_events = logs_response.get('events', [])
+            # Independent of the shared tailer, whose cursor belongs to tail_lambda_logs
+            log_events = fetch_events(self.logs_client, self.lambda_log_group, int(start_time.timestamp() * 1000))
             if not log_events:
                 return "No log events found for Lambda function in the specified time range"
-            formatted_logs = [
-                f"{datetime.fromtimestamp(event['timestamp'] / 1000).strftime('%Y-%m-%d %H:%M:%S')}: {event['message']}"
-                for event in log_events
-            ]
-            return "\n".join(formatted_logs)
+            return "\n".join(format_event(event) for event in log_events)
         except Exception as e:
             logger.error(f"Error getting Lambda logs: {str(e)}", exc_info=True)
             return f"Error getting Lambda logs: {str(e)}"
 
-def get_orchestrator() -> InlineAgentOrchestrator:
+    def tail_lambda_logs(self, timeout: Optional[float] = None) -> Iterator[str]:
+        """Start background tailing of the Lambda log group and yield new lines as they arrive."""
+        tailer = get_tailer(self.logs_client, self.lambda_log_group).start()
+        yield from tailer.lines(timeout=timeout)
+
+class InlineAgentOrchestratorPool:
+    """Maps S2S session ids to their own InlineAgentOrchestrator.
+
+    All pooled orchestrators share the boto3 clients and parsed schema of a
+    single base orchestrator, so adding a conversation only costs a new
+    Bedrock session id. The pool is bounded: the least recently used entry is
+    evicted when max_size is reached, and entries idle for longer than
+    idle_ttl seconds are dropped on the next access.
+    """
+    def __init__(self, max_size: int = DEFAULT_POOL_SIZE, idle_ttl: float = DEFAULT_POOL_IDLE_TTL,
+                 config: Optional[Dict[str, Any]] = None) -> None:
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self.max_size = max_size
+        self.idle_ttl = idle_ttl
+        self.config = config
+        self._base: Optional[InlineAgentOrchestrator] = None
+        self._entries: "OrderedDict[str, tuple[InlineAgentOrchestrator, float]]" = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: str) -> InlineAgentOrchestrator:
+        now = time.monotonic()
+        with self._lock:
+            self._evict_idle(now)
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                orchestrator = entry[0]
+            else:
+                if self._base is None:
+                    self._base = InlineAgentOrchestrator(self.config)
+                orchestrator = InlineAgentOrchestrator(self.config, shared_from=self._base)
+                while len(self._entries) >= self.max_size:
+                    evicted_key, _ = self._entries.popitem(last=False)
+                    logger.info(f"Evicted inline agent for session {evicted_key} (pool full)")
+            self._entries[key] = (orchestrator, now)
+            return orchestrator
+
+    def release(self, key: str) -> None:
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                logger.info(f"Released inline agent for session {key}")
+
+    def evict_idle(self) -> None:
+        with self._lock:
+            self._evict_idle(time.monotonic())
+
+    def _evict_idle(self, now: float) -> None:
+        while self._entries:
+            key, (_, last_used) = next(iter(self._entries.items()))
+            if now - last_used < self.idle_ttl:
+                break
+            del self._entries[key]
+            logger.info(f"Evicted idle inline agent for session {key}")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+def get_orchestrator_pool() -> InlineAgentOrchestratorPool:
+    global _orchestrator_pool
+    with _orchestrator_lock:
+        if _orchestrator_pool is None:
+            _orchestrator_pool = InlineAgentOrchestratorPool()
+        return _orchestrator_pool
+
+def get_orchestrator(session_id: Optional[str] = None) -> InlineAgentOrchestrator:
+    """Return the orchestrator for session_id, or the shared default one when no id is given."""
     global _orchestrator
+    if session_id is not None:
+        return get_orchestrator_pool().get(session_id)
     with _orchestrator_lock:
         if _orchestrator is None:
             _orchestrator = InlineAgentOrchestrator()
         return _orchestrator
 
-async def invoke_agent(query: str) -> str:
-    orchestrator = get_orchestrator()
+def release_orchestrator(session_id: str) -> None:
+    """Drop the orchestrator bound to session_id, if any."""
+    if _orchestrator_pool is not None:
+        _orchestrator_pool.release(session_id)
+
+@traced("inline_agent.invoke_agent")
+async def invoke_agent(query: str, session_id: Optional[str] = None) -> str:
+    orchestrator = get_orchestrator(session_id)
     try:
         return await asyncio.to_thread(orchestrator.invoke, query)
     except AttributeError:
         loop = asyncio.get_event_loop()
         return await loop.run_in_executor(None, orchestrator.invoke, query)
 
+async def stream_agent(query: str, session_id: Optional[str] = None) -> AsyncIterator[str]:
+    """Async variant of invoke_agent that yields answer chunks as they arrive."""
+    orchestrator = get_orchestrator(session_id)
+    chunks = orchestrator.invoke_stream(query)
+    while True:
+        chunk = await asyncio.to_thread(next, chunks, None)
+        if chunk is None:
+            break
+        yield chunk
+
 async def cleanup_agent() -> None:
     """Clean up the orchestrator resources and reset the global instance."""
     global _orchestrator
     logger.info("Cleaning up inline agent resources")
     try:
         with _orchestrator_lock:
+            if _orchestrator_pool is not None:
+                _orchestrator_pool.clear()
             if _orchestrator is not None:
                 # Release any resources if needed
                 logger.info(f"Releasing resources for session: {_orchestrator.session_id}")
@@ -0,0 +1,149 @@
+# log_tailer.py
+import logging
+import queue
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+
+DEFAULT_POLL_INTERVAL = 2.0
+# CloudWatch may ingest events late; re-scan this window and de-duplicate by eventId.
+DEFAULT_LOOKBACK_MS = 10_000
+DEFAULT_MAX_BUFFER = 10_000
+
+logger = logging.getLogger("log_tailer")
+
+_tailers: Dict[str, "CloudWatchLogTailer"] = {}
+_tailers_lock = threading.Lock()
+
+
+def format_event(event: Dict[str, Any]) -> str:
+    timestamp = datetime.fromtimestamp(event['timestamp'] / 1000).strftime('%Y-%m-%d %H:%M:%S')
+    return f"{timestamp}: {event['message'].rstrip()}"
+
+
+def fetch_events(logs_client: Any, log_group: str, start_ms: int,
+                 end_ms: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Every event in log_group between start_ms and end_ms (default: now), across all streams.
+
+    Stateless, so concurrent callers each get the full window regardless of
+    what any tailer has already consumed.
+    """
+    params = {"logGroupName": log_group, "startTime": start_ms}
+    if end_ms is not None:
+        params["endTime"] = end_ms
+    paginator = logs_client.get_paginator('filter_log_events')
+    events = [event for page in paginator.paginate(**params) for event in page.get('events', [])]
+    events.sort(key=lambda e: e['timestamp'])
+    return events
+
+
+class CloudWatchLogTailer:
+    """Incrementally tails a CloudWatch log group across all of its streams.
+
+    A cursor remembers the newest event timestamp seen, so each fetch only
+    pulls new events via paginated filter_log_events. Events are
+    de-duplicated by eventId inside a short lookback window to catch late
+    ingestion. start() polls in a background thread and buffers new lines
+    for lines() to consume.
+
+    The cursor is shared by everything reading from this tailer, so it is
+    meant for a single consumer of lines(); one-off reads of a time window
+    should use fetch_events().
+    """
+    def __init__(self, logs_client: Any, log_group: str, start_time_ms: Optional[int] = None,
+                 poll_interval: float = DEFAULT_POLL_INTERVAL, lookback_ms: int = DEFAULT_LOOKBACK_MS,
+                 max_buffer: int = DEFAULT_MAX_BUFFER) -> None:
+        self.logs_client = logs_client
+        self.log_group = log_group
+        self.poll_interval = poll_interval
+        self.lookback_ms = lookback_ms
+        self._cursor_ms = start_time_ms if start_time_ms is not None else int(time.time() * 1000)
+        self._seen: Dict[str, int] = {}
+        self._fetch_lock = threading.Lock()
+        self._buffer: "queue.Queue[str]" = queue.Queue(maxsize=max_buffer)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def fetch_new(self) -> List[Dict[str, Any]]:
+        """Return events newer than the cursor and advance the cursor."""
+        with self._fetch_lock:
+            start_ms = max(self._cursor_ms - self.lookback_ms, 0)
+            paginator = self.logs_client.get_paginator('filter_log_events')
+            new_events = []
+            for page in paginator.paginate(logGroupName=self.log_group, startTime=start_ms):
+                for event in page.get('events', []):
+                    event_id = event.get('eventId')
+                    if event_id in self._seen:
+                        continue
+                    self._seen[event_id] = event['timestamp']
+                    new_events.append(event)
+            if new_events:
+                new_events.sort(key=lambda e: e['timestamp'])
+                self._cursor_ms = max(self._cursor_ms, new_events[-1]['timestamp'])
+            horizon = self._cursor_ms - self.lookback_ms
+            self._seen = {k: ts for k, ts in self._seen.items() if ts >= horizon}
+            return new_events
+
+    def start(self) -> "CloudWatchLogTailer":
+        """Start polling in a background thread. Safe to call more than once."""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._poll, name=f"log-tailer:{self.log_group}", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.poll_interval + 1)
+            self._thread = None
+
+    def _poll(self) -> None:
+        while not self._stop.is_set():
+            try:
+                for event in self.fetch_new():
+                    line = format_event(event)
+                    try:
+                        self._buffer.put_nowait(line)
+                    except queue.Full:
+                        # Drop the oldest line rather than stall the poller.
+                        self._buffer.get_nowait()
+                        self._buffer.put_nowait(line)
+            except Exception as e:
+                logger.warning(f"Failed to fetch logs for {self.log_group}: {str(e)}")
+            self._stop.wait(self.poll_interval)
+
+    def lines(self, timeout: Optional[float] = None) -> Iterator[str]:
+        """Yield new log lines as they arrive.
+
+        With the background poller running, blocks for up to timeout seconds
+        waiting for each line (forever if timeout is None). Without it,
+        performs one fetch and yields whatever is new.
+        """
+        if self._thread is None:
+            for event in self.fetch_new():
+                yield format_event(event)
+            return
+        while True:
+            try:
+                yield self._buffer.get(timeout=timeout)
+            except queue.Empty:
+                return
+
+
+def get_tailer(logs_client: Any, log_group: str, start_time_ms: Optional[int] = None) -> CloudWatchLogTailer:
+    """Return the process-wide tailer for log_group, creating it on first use."""
+    with _tailers_lock:
+        tailer = _tailers.get(log_group)
+        if tailer is None:
+            tailer = CloudWatchLogTailer(logs_client, log_group, start_time_ms=start_time_ms)
+            _tailers[log_group] = tailer
+        return tailer
+
+
+def stop_all() -> None:
+    with _tailers_lock:
+        for tailer in _tailers.values():
+            tailer.stop()
+        _tailers.clear()
@@ -1,47 +1,213 @@
 import asyncio
 import json
-from contextlib import AsyncExitStack
 from typing import Any, Dict, List, Optional
 import os
 
 from mcp import ClientSession, StdioServerParameters
 from mcp.client.stdio import stdio_client
 
-class McpLocationClient:
-    def __init__(self):
-        # Initialize session and client objects
+from integration.mcp_launch import location_server_params
+from integration.tool_cache import ToolResultCache
+from integration.tracing import set_attributes, traced
+
+DEFAULT_POOL_SIZE = int(os.getenv("MCP_POOL_SIZE", "2"))
+DEFAULT_HEALTH_CHECK_INTERVAL = float(os.getenv("MCP_HEALTH_CHECK_INTERVAL", "30"))
+HEALTH_CHECK_TIMEOUT = 5
+CACHE_ENABLED = os.getenv("MCP_CACHE_ENABLED", "true").lower() == "true"
+
+
+class McpServerProcess:
+    """One MCP server subprocess and its stdio ClientSession.
+
+    The stdio transport is entered and exited by a dedicated owner task, as
+    the underlying anyio task group requires, while any task may issue calls
+    through the session.
+    """
+    def __init__(self, server_params: StdioServerParameters, index: int = 0):
+        self.server_params = server_params
+        self.index = index
         self.session: Optional[ClientSession] = None
-        self.exit_stack = AsyncExitStack()
-        self.stdio: Optional[Any] = None
-        self.write: Optional[Any] = None
+        self.in_flight = 0
+        self._task: Optional[asyncio.Task] = None
+        self._ready = asyncio.Event()
+        self._stopping = asyncio.Event()
+        self._error: Optional[BaseException] = None
+
+    async def start(self):
+        self._task = asyncio.create_task(self._run())
+        await self._ready.wait()
+        if self._error:
+            raise self._error
+
+    async def _run(self):
+        try:
+            async with stdio_client(self.server_params) as (read, write):
+                async with ClientSession(read, write) as session:
+                    await session.initialize()
+                    self.session = session
+                    self._ready.set()
+                    await self._stopping.wait()
+        except Exception as ex:
+            self._error = ex
+            print(f"MCP server process {self.index} exited: {ex}")
+        finally:
+            self.session = None
+            self._ready.set()
+
+    @property
+    def healthy(self) -> bool:
+        return self.session is not None and self._task is not None and not self._task.done()
+
+    async def ping(self) -> bool:
+        if not self.healthy:
+            return False
+        try:
+            await asyncio.wait_for(self.session.send_ping(), timeout=HEALTH_CHECK_TIMEOUT)
+            return True
+        except Exception:
+            return False
+
+    async def call_tool(self, tool_name, arguments):
+        self.in_flight += 1
+        try:
+            return await self.session.call_tool(tool_name, arguments)
+        finally:
+            self.in_flight -= 1
+
+    async def close(self):
+        self._stopping.set()
+        if self._task and not self._task.done():
+            try:
+                await asyncio.wait_for(self._task, timeout=HEALTH_CHECK_TIMEOUT)
+            except (asyncio.TimeoutError, asyncio.CancelledError):
+                self._task.cancel()
+
+
+class McpLocationClient:
+    """Dispatches location tool calls across a pool of MCP server subprocesses.
+
+    Each call goes to the healthy process with the fewest calls in flight.
+    A background task pings every process and respawns those that died or
+    stopped answering. Successful results are kept in a ToolResultCache
+    unless enable_cache is False. The pool is started either eagerly with
+    connect_to_server() or in the background with start_warm_up(); in the
+    latter case the first tool call waits for the warm-up to finish.
+    """
+    def __init__(self, pool_size=DEFAULT_POOL_SIZE, health_check_interval=DEFAULT_HEALTH_CHECK_INTERVAL,
+                 cache: Optional[ToolResultCache] = None, enable_cache=CACHE_ENABLED):
+        self.pool_size = max(1, pool_size)
+        self.health_check_interval = health_check_interval
+        self.cache = cache if cache is not None else (ToolResultCache() if enable_cache else None)
+        self.processes: List[McpServerProcess] = []
+        self._health_task: Optional[asyncio.Task] = None
+        self._respawn_lock = asyncio.Lock()
+        self._connect_task: Optional[asyncio.Task] = None
+        self._tools: Optional[List[Dict[str, Any]]] = None
+
+    def _server_params(self) -> StdioServerParameters:
+        return location_server_params()
+
+    @property
+    def warm(self) -> bool:
+        """True once at least one server process is connected."""
+        return any(p.healthy for p in self.processes)
+
+    def start_warm_up(self) -> asyncio.Task:
+        """Connect the pool in the background and return immediately."""
+        if self._connect_task is None:
+            self._connect_task = asyncio.create_task(self.connect_to_server())
+        return self._connect_task
+
+    async def _ensure_connected(self):
+        if self.processes:
+            return
+        # Share one connection attempt between concurrent first callers
+        task = self.start_warm_up()
+        try:
+            await asyncio.shield(task)
+        except Exception:
+            if self._connect_task is task:
+                self._connect_task = None  # allow a later call to retry
+            raise
+
+    async def _spawn(self, index) -> McpServerProcess:
+        process = McpServerProcess(self._server_params(), index)
+        await process.start()
+        return process
 
     async def connect_to_server(self):
-        aws_profile = os.getenv("AWS_PROFILE")
-        env = {"FASTMCP_LOG_LEVEL": "ERROR"}
-        if aws_profile:
-            env["AWS_PROFILE"] = aws_profile
-            
-        server_params = StdioServerParameters(
-                command="uvx",
-                args=["awslabs.aws-location-mcp-server@latest"],
-                env=env
-            )
-        
-        # Connect to the server
-        stdio_transport = await self.exit_stack.enter_async_context(
-            stdio_client(server_params)
-        )
-        self.stdio, self.write = stdio_transport
-        self.session = await self.exit_stack.enter_async_context(
-            ClientSession(self.stdio, self.write)
+        if self.processes:
+            return
+        # Start the whole pool concurrently
+        results = await asyncio.gather(
+            *(self._spawn(i) for i in range(self.pool_size)), return_exceptions=True
         )
+        for result in results:
+            if isinstance(result, BaseException):
+                print(f"Failed to start MCP server process: {result}")
+            else:
+                self.processes.append(result)
+        if not self.processes:
+            raise RuntimeError("No MCP server process could be started")
+        self._health_task = asyncio.create_task(self._health_check_loop())
 
-        # Initialize the connection
-        await self.session.initialize()
+    async def _health_check_loop(self):
+        while True:
+            await asyncio.sleep(self.health_check_interval)
+            try:
+                await self.check_health()
+            except asyncio.CancelledError:
+                raise
+            except Exception as ex:
+                print(f"MCP health check failed: {ex}")
+
+    async def check_health(self):
+        """Ping every process and respawn the ones that are down."""
+        pings = await asyncio.gather(*(p.ping() for p in self.processes))
+        for process, ok in zip(list(self.processes), pings):
+            if not ok:
+                await self._respawn(process)
+        # Refill slots whose spawn failed at startup
+        while len(self.processes) < self.pool_size:
+            try:
+                self.processes.append(await self._spawn(len(self.processes)))
+            except Exception as ex:
+                print(f"Failed to start MCP server process: {ex}")
+                break
+
+    async def _respawn(self, process: McpServerProcess):
+        async with self._respawn_lock:
+            if process not in self.processes or process.healthy and await process.ping():
+                return
+            print(f"Respawning MCP server process {process.index}")
+            await process.close()
+            replacement = await self._spawn(process.index)
+            self.processes[self.processes.index(process)] = replacement
+
+    async def _acquire(self) -> McpServerProcess:
+        await self._ensure_connected()
+        healthy = [p for p in self.processes if p.healthy]
+        if not healthy:
+            if not self.processes:
+                raise RuntimeError("MCP client is not connected")
+            await self._respawn(self.processes[0])
+            healthy = [p for p in self.processes if p.healthy]
+            if not healthy:
+                raise RuntimeError("No healthy MCP server process available")
+        return min(healthy, key=lambda p: p.in_flight)
+
+    @property
+    def session(self) -> Optional[ClientSession]:
+        healthy = [p for p in self.processes if p.healthy]
+        return min(healthy, key=lambda p: p.in_flight).session if healthy else None
 
     async def get_mcp_tools(self) -> List[Dict[str, Any]]:
-        tools_result = await self.session.list_tools()
-        return [
+        # Every process runs the same server, so the tool list is fetched once
+        if self._tools is not None:
+            return self._tools
+        process = await self._acquire()
+        tools_result = await process.session.list_tools()
+        self._tools = [
             {
                 "type": "function",
                 "function": {
@@ -52,21 +218,58 @@ class McpLocationClient:
             }
             for tool in tools_result.tools
         ]
+        return self._tools
 
+    @traced("mcp.call_tool")
     async def call_tool(self, input):
         if isinstance(input, str):
             input = json.loads(input)
-        
+
         tool_name = input.get("tool", "search_places")
         query = input.get("query", input)
+        set_attributes(tool_name=tool_name)
+
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self.cache.key_for(tool_name, query)
+            cached = await self.cache.get_async(cache_key)
+            if cached is not None:
+                set_attributes(cache_hit=True)
+                return cached
 
-        response = await self.session.call_tool(tool_name, {"query":query})
+        process = await self._acquire()
+        set_attributes(process=process.index)
+        try:
+            response = await process.call_tool(tool_name, {"query":query})
+        except Exception as ex:
+            # The process may have died mid-call; retry once on a fresh one
+            print(f"MCP call failed on process {process.index}, retrying: {ex}")
+            if not process.healthy or not await process.ping():
+                await self._respawn(process)
+            process = await self._acquire()
+            response = await process.call_tool(tool_name, {"query":query})
         print("!!!!",tool_name, query, response)
         result = []
         for c in response.content:
             result.append(c.text)
+        if cache_key is not None and not getattr(response, "isError", False):
+            await self.cache.set_async(cache_key, result, tool_name)
         return result
 
     async def cleanup(self):
-        """Clean up resources."""
-        await self.exit_stack.aclose()
+        """Shut down the health checker and every server process."""
+        if self._connect_task and not self._connect_task.done():
+            self._connect_task.cancel()
+            try:
+                await self._connect_task
+            except (asyncio.CancelledError, Exception):
+                pass
+        if self._health_task:
+            self._health_task.cancel()
+            try:
+                await self._health_task
+            except asyncio.CancelledError:
+                pass
+            self._health_task = None
+        processes, self.processes = self.processes, []
+        await asyncio.gather(*(p.close() for p in processes), return_exceptions=True)
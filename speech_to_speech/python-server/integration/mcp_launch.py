@@ -0,0 +1,62 @@
+# mcp_launch.py
+"""Launch settings for the AWS Location MCP server shared by the MCP and Strands integrations.
+
+MCP_LAUNCH_MODE selects how the server process is started:
+  latest  - uvx awslabs.aws-location-mcp-server@latest (resolves on every start; default)
+  pinned  - uvx awslabs.aws-location-mcp-server==$MCP_LOCATION_SERVER_VERSION, reusing
+            uv's cached environment (add MCP_UVX_OFFLINE=true to never touch the network)
+  command - run a pre-installed server directly, e.g. after
+            `uv tool install awslabs.aws-location-mcp-server==<version>`. Uses
+            $MCP_LOCATION_SERVER_COMMAND (default: the console script on PATH) and
+            $MCP_LOCATION_SERVER_ARGS.
+MCP_LAZY_CONNECT=true defers the connection to a background warm-up at server start,
+so the WebSocket server accepts connections without waiting for MCP.
+"""
+import os
+import shlex
+import shutil
+
+from mcp import StdioServerParameters
+
+MCP_LOCATION_PACKAGE = "awslabs.aws-location-mcp-server"
+LAUNCH_MODE = os.getenv("MCP_LAUNCH_MODE", "latest").lower()
+PINNED_VERSION = os.getenv("MCP_LOCATION_SERVER_VERSION", "")
+UVX_OFFLINE = os.getenv("MCP_UVX_OFFLINE", "false").lower() == "true"
+SERVER_COMMAND = os.getenv("MCP_LOCATION_SERVER_COMMAND", "")
+SERVER_ARGS = os.getenv("MCP_LOCATION_SERVER_ARGS", "")
+LAZY_CONNECT = os.getenv("MCP_LAZY_CONNECT", "false").lower() == "true"
+
+
+def server_env():
+    aws_profile = os.getenv("AWS_PROFILE")
+    env = {"FASTMCP_LOG_LEVEL": "ERROR"}
+    if aws_profile:
+        env["AWS_PROFILE"] = aws_profile
+    return env
+
+
+def location_server_params(mode=None) -> StdioServerParameters:
+    """Build the stdio launch parameters for the configured launch mode."""
+    mode = (mode or LAUNCH_MODE).lower()
+    if mode == "pinned":
+        if not PINNED_VERSION:
+            raise RuntimeError("MCP_LOCATION_SERVER_VERSION must be set when MCP_LAUNCH_MODE=pinned")
+        args = [f"{MCP_LOCATION_PACKAGE}=={PINNED_VERSION}"]
+        if UVX_OFFLINE:
+            args.insert(0, "--offline")
+        return StdioServerParameters(command="uvx", args=args, env=server_env())
+    if mode == "command":
+        command = SERVER_COMMAND or shutil.which(MCP_LOCATION_PACKAGE)
+        if not command:
+            raise RuntimeError(
+                f"{MCP_LOCATION_PACKAGE} is not installed; set MCP_LOCATION_SERVER_COMMAND "
+                f"or run `uv tool install {MCP_LOCATION_PACKAGE}`"
+            )
+        return StdioServerParameters(command=command, args=shlex.split(SERVER_ARGS), env=server_env())
+    if mode != "latest":
+        raise RuntimeError(f"Unknown MCP_LAUNCH_MODE: {mode}")
+    return StdioServerParameters(
+        command="uvx",
+        args=[f"{MCP_LOCATION_PACKAGE}@latest"],
+        env=server_env()
+    )
@@ -1,22 +1,80 @@
-from mcp import stdio_client, StdioServerParameters
+from mcp import stdio_client
 from strands import Agent, tool
 from strands.tools.mcp import MCPClient
 from strands.models import BedrockModel
+from strands.agent.conversation_manager import SlidingWindowConversationManager, SummarizingConversationManager
+from strands.types.exceptions import ContextWindowOverflowException
 import boto3 
 import os
 import json
 import requests
+from requests.adapters import HTTPAdapter
 import re
+import math
+import asyncio
+import threading
+import time
+import uuid
+from collections import OrderedDict
 
-@tool
-def weather(lat, lon: float) -> str:
-    """Get weather information for a given lat and lon
+from integration.mcp_launch import location_server_params
+from integration.tool_cache import ToolResultCache
+from integration.tracing import set_attributes, traced
 
-    Args:
-        lat: latitude of the location
-        lon: logitude of the location
-    """
-    url = "https://api.open-meteo.com/v1/forecast"
+SYSTEM_PROMPT = "You are a chat agent tasked with answering location and weather-related questions. Please include your response within the <response></response> tag."
+# "window" trims the oldest turns to stay under the token budget; "summarizing" folds them into a summary
+CONVERSATION_MANAGER = os.getenv("STRANDS_CONVERSATION_MANAGER", "window").lower()
+TOKEN_BUDGET = int(os.getenv("STRANDS_TOKEN_BUDGET", "8000"))
+WINDOW_SIZE = int(os.getenv("STRANDS_WINDOW_SIZE", "40"))
+MAX_SESSIONS = int(os.getenv("STRANDS_MAX_SESSIONS", "64"))
+SESSION_IDLE_TTL = float(os.getenv("STRANDS_SESSION_IDLE_TTL", "900"))
+
+WEATHER_URL = os.getenv("OPEN_METEO_URL", "https://api.open-meteo.com/v1/forecast")
+WEATHER_TIMEOUT = (float(os.getenv("WEATHER_CONNECT_TIMEOUT", "2")), float(os.getenv("WEATHER_READ_TIMEOUT", "5")))
+WEATHER_CACHE_TTL = float(os.getenv("WEATHER_CACHE_TTL", "300"))
+# Size of the lat/lon grid cell (in degrees) that shares a cached result; 0.05 is roughly 5 km
+WEATHER_GRID_DEGREES = float(os.getenv("WEATHER_GRID_DEGREES", "0.05"))
+
+# One pooled, keep-alive HTTP session for all weather calls
+_weather_http = requests.Session()
+_weather_http.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=32))
+_weather_http.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=32))
+_weather_cache = ToolResultCache(ttls={"weather": WEATHER_CACHE_TTL}, max_entries=4096)
+
+
+def use_shared_cache(backend):
+    """Back the weather cache with a shared-state backend (see shared_state.py)."""
+    _weather_cache.backend = backend
+
+
+def _weather_cache_key(lat, lon):
+    """Cache key for the grid cell, or None when lat/lon are not numbers."""
+    try:
+        return f"weather:{round(float(lat) / WEATHER_GRID_DEGREES)}:{round(float(lon) / WEATHER_GRID_DEGREES)}"
+    except (TypeError, ValueError):
+        # Not cached; the request below fails and returns the default response as before
+        return None
+
+
+def fetch_weather(lat, lon):
+    """Return the current weather for lat/lon, cached per grid cell for WEATHER_CACHE_TTL seconds."""
+    key = _weather_cache_key(lat, lon)
+    cached = _weather_cache.get(key) if key else None
+    if cached is not None:
+        return cached
+    return _request_weather(lat, lon, key)
+
+
+async def fetch_weather_async(lat, lon):
+    """Async variant of fetch_weather; cache hits return without leaving the event loop."""
+    key = _weather_cache_key(lat, lon)
+    cached = await _weather_cache.get_async(key) if key else None
+    if cached is not None:
+        return cached
+    return await asyncio.to_thread(_request_weather, lat, lon, key)
+
+
+def _request_weather(lat, lon, key):
     params = {
         "latitude": str(lat),
         "longitude": str(lon),
@@ -25,27 +83,187 @@ def weather(lat, lon: float) -> str:
     # Default weather response in case of open-meteo call failure
     result = {"generationtime_ms": 0.07450580596923828, "utc_offset_seconds": 0, "timezone": "GMT", "timezone_abbreviation": "GMT", "elevation": 76.0, "current_weather_units": {"time": "iso8601", "interval": "seconds", "temperature": "\u00b0C", "windspeed": "km/h", "winddirection": "\u00b0", "is_day": "", "weathercode": "wmo code"}, "current_weather": {"time": "2025-07-11T12:30", "interval": 900, "temperature": 21.6, "windspeed": 6.1, "winddirection": 360, "is_day": 1, "weathercode": 2}}
     try:
-        response = requests.get(url, params=params)
+        response = _weather_http.get(WEATHER_URL, params=params, timeout=WEATHER_TIMEOUT)
         result = response.json()["current_weather"]
+        if key:
+            _weather_cache.set(key, result, "weather")
     except Exception as ex:
         print(ex)
     return result
 
+
+@tool
+def weather(lat, lon: float) -> str:
+    """Get weather information for a given lat and lon
+
+    Args:
+        lat: latitude of the location
+        lon: logitude of the location
+    """
+    return fetch_weather(lat, lon)
+
+_RESPONSE_TAG = re.compile(r"<response>(.*?)</response>", re.DOTALL)
+_ANSWER_TAG = re.compile(r"<answer>(.*?)</answer>", re.DOTALL)
+_JSON_TYPES = {
+    "string": str,
+    "integer": int,
+    "number": (int, float),
+    "boolean": bool,
+    "object": dict,
+    "array": list,
+}
+
+
+def _coerce_number(value, type_name):
+    """Parse a numeric string ("47.6") the model sent for a number or integer argument."""
+    if not isinstance(value, str):
+        return value
+    try:
+        number = float(value.strip())
+    except ValueError:
+        return value
+    if not math.isfinite(number):
+        return value
+    if number.is_integer() and (type_name == "integer" or re.fullmatch(r"\s*[+-]?\d+\s*", value)):
+        return int(number)
+    return number
+
+
+def validate_arguments(schema, arguments):
+    """Check arguments against a tool's JSON input schema (required keys and top-level types).
+
+    Numeric strings are accepted for number and integer arguments; returns the
+    arguments with those converted.
+    """
+    if not isinstance(arguments, dict):
+        raise ValueError("Tool arguments must be a JSON object")
+    missing = [name for name in schema.get("required", []) if name not in arguments]
+    if missing:
+        raise ValueError(f"Missing required argument(s): {', '.join(missing)}")
+    properties = schema.get("properties", {})
+    if schema.get("additionalProperties") is False:
+        unknown = [name for name in arguments if name not in properties]
+        if unknown:
+            raise ValueError(f"Unknown argument(s): {', '.join(unknown)}")
+    coerced = {}
+    for name, value in arguments.items():
+        type_name = properties.get(name, {}).get("type")
+        expected = _JSON_TYPES.get(type_name)
+        if type_name in ("number", "integer"):
+            value = _coerce_number(value, type_name)
+        if expected and (not isinstance(value, expected) or isinstance(value, bool) and expected is not bool):
+            raise ValueError(f"Argument '{name}' must be of type {type_name}")
+        coerced[name] = value
+    return coerced
+
+
+def _tool_arguments(input):
+    """Turn a Sonic tool input (JSON string, plain query or dict) into tool arguments."""
+    if isinstance(input, str):
+        try:
+            input = json.loads(input)
+        except json.JSONDecodeError:
+            return {"query": input}
+    if not isinstance(input, dict):
+        return {"query": input}
+    if isinstance(input.get("params"), dict):
+        return input["params"]
+    if "query" in input:
+        return {"query": input["query"]}
+    return {k: v for k, v in input.items() if k != "tool"}
+
+
+def estimate_tokens(messages):
+    """Rough token count for a message list (about four characters per token)."""
+    return len(json.dumps(messages, default=str)) // 4
+
+
+class TokenBudgetConversationManager(SlidingWindowConversationManager):
+    """Sliding window that also drops the oldest turns while the history exceeds token_budget."""
+
+    def __init__(self, token_budget=TOKEN_BUDGET, window_size=WINDOW_SIZE):
+        # Tool results are truncated by reduce_context below, only once no turn can be trimmed
+        super().__init__(window_size=window_size, should_truncate_results=False)
+        self.token_budget = token_budget
+
+    def apply_management(self, agent, **kwargs):
+        super().apply_management(agent, **kwargs)
+        while estimate_tokens(agent.messages) > self.token_budget:
+            try:
+                self.reduce_context(agent)
+            except ContextWindowOverflowException:
+                break
+
+    @staticmethod
+    def _is_prompt(message):
+        return message["role"] == "user" and not any("toolResult" in content for content in message["content"])
+
+    def reduce_context(self, agent, e=None, **kwargs):
+        """Drop the oldest turn (a user prompt and everything up to the next one).
+
+        Only once the current turn is all that is left is the latest tool
+        result truncated.
+        """
+        messages = agent.messages
+        next_turn = next((i for i in range(1, len(messages)) if self._is_prompt(messages[i])), None)
+        if next_turn is not None:
+            self.removed_message_count += next_turn
+            messages[:] = messages[next_turn:]
+            return
+        index = self._find_last_message_with_tool_results(messages)
+        if index is None or not self._truncate_tool_results(messages, index):
+            raise ContextWindowOverflowException("Unable to trim conversation context!") from e
+
+
 class StrandsAgent:
 
-    def __init__(self):
+    def __init__(self, lazy=False, max_sessions=MAX_SESSIONS, session_idle_ttl=SESSION_IDLE_TTL):
+        """Start the MCP server and build the agent.
+
+        With lazy=True this happens on a background thread and the first
+        query waits for it, so server startup is not blocked.
+
+        Queries that pass a session_id get their own Agent, sharing the model
+        and tools, with a bounded conversation history. At most max_sessions
+        are kept; the least recently used is evicted first, and sessions idle
+        for session_idle_ttl seconds are dropped.
+        """
+        self.agent = None
+        self.aws_location_srv_client = None
+        self.max_sessions = max_sessions
+        self.session_idle_ttl = session_idle_ttl
+        self._sessions = OrderedDict()
+        self._sessions_lock = threading.Lock()
+        self._ready = threading.Event()
+        self._error = None
+        if lazy:
+            threading.Thread(target=self._warm_up, name="strands-warm-up", daemon=True).start()
+        else:
+            self._build()
+            self._ready.set()
+
+    @property
+    def warm(self):
+        return self.agent is not None
+
+    def _warm_up(self):
+        try:
+            self._build()
+        except Exception as ex:
+            self._error = ex
+            print("Failed to start Strands agent", ex)
+        finally:
+            self._ready.set()
+
+    def _ensure_ready(self):
+        self._ready.wait()
+        if self.agent is None:
+            raise RuntimeError(f"Strands agent is not available: {self._error}")
+
+    def _build(self):
         # Launch AWS Location Service MCP Server and create a client object
-        aws_profile = os.getenv("AWS_PROFILE")
-        env = {"FASTMCP_LOG_LEVEL": "ERROR"}
-        if aws_profile:
-            env["AWS_PROFILE"] = aws_profile
-
-        self.aws_location_srv_client = MCPClient(lambda: stdio_client(
-            StdioServerParameters(
-                command="uvx", 
-                args=["awslabs.aws-location-mcp-server@latest"],
-                env=env)
-            ))
+        server_params = location_server_params()
+        self.aws_location_srv_client = MCPClient(lambda: stdio_client(server_params))
         self._server_context = self.aws_location_srv_client.__enter__()
         self.aws_location_srv_tools = self.aws_location_srv_client.list_tools_sync()
 
@@ -60,12 +278,47 @@ class StrandsAgent:
         # Create a Strands Agent
         tools = self.aws_location_srv_tools
         tools.append(weather)
-        self.agent = Agent(
-            tools=tools, 
-            model=bedrock_model,
-            system_prompt="You are a chat agent tasked with answering location and weather-related questions. Please include your response within the <response></response> tag."
+        self.model = bedrock_model
+        self.tools = tools
+        # Name -> tool, resolved once so direct calls skip attribute lookup and the agent loop
+        self.tool_index = {t.tool_name: t for t in tools}
+        self.agent = self._new_agent()
+
+    def _new_conversation_manager(self):
+        if CONVERSATION_MANAGER == "summarizing":
+            return SummarizingConversationManager()
+        return TokenBudgetConversationManager()
+
+    def _new_agent(self):
+        return Agent(
+            tools=self.tools, 
+            model=self.model,
+            system_prompt=SYSTEM_PROMPT,
+            conversation_manager=self._new_conversation_manager()
         )
 
+    def _session_agent(self, session_id):
+        """Return (agent, lock) for session_id, creating it and evicting old sessions as needed."""
+        now = time.monotonic()
+        with self._sessions_lock:
+            while self._sessions:
+                oldest_id, (_, _, last_used) = next(iter(self._sessions.items()))
+                if now - last_used < self.session_idle_ttl:
+                    break
+                del self._sessions[oldest_id]
+            entry = self._sessions.pop(session_id, None)
+            if entry is None:
+                entry = (self._new_agent(), threading.Lock(), now)
+                while len(self._sessions) >= self.max_sessions:
+                    self._sessions.popitem(last=False)
+            agent, lock, _ = entry
+            self._sessions[session_id] = (agent, lock, now)
+            return agent, lock
+
+    def release_session(self, session_id):
+        with self._sessions_lock:
+            self._sessions.pop(session_id, None)
+
 
     '''
     Send the input to the agent, allowing it to handle tool selection and invocation. 
@@ -73,15 +326,19 @@ class StrandsAgent:
     This approach is suitable when you want to delegate tool selection logic to the agent, and have a generic toolUse definition in Sonic ToolUse.
     Note that the reasoning process may introduce latency, so it's recommended to use a lightweight model such as Nova Lite.
     Sample parameters: input="largest zoo in Seattle?"
+    Pass session_id to keep a separate, bounded conversation per S2S session.
     '''
-    def query(self, input):
-        output = str(self.agent(input))
-        if "<response>" in output and "</response>" in output:
-            match = re.search(r"<response>(.*?)</response>", output, re.DOTALL)
-            if match:
-                output = match.group(1)
-        elif "<answer>" in output and "</answer>" in output:
-            match = re.search(r"<answer>(.*?)</answer>", output, re.DOTALL)
+    @traced("strands.query")
+    def query(self, input, session_id=None):
+        self._ensure_ready()
+        if session_id is None:
+            output = str(self.agent(input))
+        else:
+            agent, lock = self._session_agent(session_id)
+            with lock:
+                output = str(agent(input))
+        if "</" in output:
+            match = _RESPONSE_TAG.search(output) or _ANSWER_TAG.search(output)
             if match:
                 output = match.group(1)
         return output
@@ -91,16 +348,47 @@ class StrandsAgent:
     This approach is suitable when tool selection is managed within Sonic and the exact toolName is already known. 
     It offers lower query latency, as no additional reasoning is performed by the agent.
     Sample parameters: tool_name="search_places", input="largest zoo in Seattle"
+    Tools are resolved from the prebuilt tool_index and called without going through
+    the agent, so nothing is added to the conversation history.
     '''
+    def has_tool(self, tool_name):
+        return self.warm and tool_name in self.tool_index
+
+    def _resolve_tool(self, tool_name, input):
+        agent_tool = self.tool_index.get(tool_name)
+        if agent_tool is None:
+            raise ValueError(f"Unknown tool: {tool_name}")
+        arguments = _tool_arguments(input)
+        arguments = validate_arguments(agent_tool.tool_spec.get("inputSchema", {}).get("json", {}), arguments)
+        return agent_tool, arguments
+
+    @staticmethod
+    def _mcp_result_text(result):
+        texts = [c["text"] for c in result.get("content", []) if "text" in c]
+        return "\n".join(texts)
+
     def call_tool(self, tool_name, input):
-        if isinstance(input, str):
-            input = json.loads(input)
-        if "query" in input:
-            input = input.get("query")
+        self._ensure_ready()
+        agent_tool, arguments = self._resolve_tool(tool_name, input)
+        if agent_tool is weather:
+            return fetch_weather(**arguments)
+        result = self.aws_location_srv_client.call_tool_sync(str(uuid.uuid4()), tool_name, arguments)
+        return self._mcp_result_text(result)
 
-        tool_func = getattr(self.agent.tool, tool_name)
-        return tool_func(query=input)
+    @traced("strands.call_tool")
+    async def call_tool_async(self, tool_name, input):
+        """Async variant of call_tool for use from the S2S event loop."""
+        set_attributes(tool_name=tool_name)
+        if not self._ready.is_set():
+            await asyncio.to_thread(self._ensure_ready)
+        self._ensure_ready()
+        agent_tool, arguments = self._resolve_tool(tool_name, input)
+        if agent_tool is weather:
+            return await fetch_weather_async(**arguments)
+        result = await self.aws_location_srv_client.call_tool_async(str(uuid.uuid4()), tool_name, arguments)
+        return self._mcp_result_text(result)
 
     def close(self):
         # Cleanup the MCP server context
-        self.aws_location_srv_client.__exit__(None, None, None)
\ No newline at end of file
+        if self.aws_location_srv_client:
+            self.aws_location_srv_client.__exit__(None, None, None)
\ No newline at end of file
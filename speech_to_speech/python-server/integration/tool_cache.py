@@ -0,0 +1,204 @@
+# tool_cache.py
+"""In-memory TTL/LRU cache for location tool results.
+
+Text lookups are keyed by a normalized query string. Coordinate lookups are
+keyed by the geohash cell containing the point, so nearby requests (e.g. two
+reverse-geocodes a few metres apart) share an entry.
+
+When a shared-state backend is attached (see shared_state.py), it acts as a
+second tier shared by every server process: local misses are looked up there
+and new results are written through to it.
+"""
+import asyncio
+import json
+import os
+import re
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Dict, Optional, Tuple
+
+DEFAULT_GEOHASH_PRECISION = int(os.getenv("MCP_CACHE_GEOHASH_PRECISION", "7"))
+DEFAULT_MAX_ENTRIES = int(os.getenv("MCP_CACHE_MAX_ENTRIES", "2048"))
+DEFAULT_MAX_BYTES = int(os.getenv("MCP_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+DEFAULT_TTLS = {
+    "search_places": 3600,
+    "get_place": 3600,
+    "search_nearby": 600,
+    "reverse_geocode": 3600,
+}
+DEFAULT_TTL = 300
+
+_GEOHASH_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+_LAT_KEYS = ("latitude", "lat")
+_LON_KEYS = ("longitude", "lon", "lng")
+
+
+def geohash_encode(lat: float, lon: float, precision: int = DEFAULT_GEOHASH_PRECISION) -> str:
+    """Encode a point as a geohash string of the given length."""
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits, bit_count, even = 0, 0, True
+    while len(chars) < precision:
+        rng, value = (lon_range, lon) if even else (lat_range, lat)
+        mid = (rng[0] + rng[1]) / 2
+        if value >= mid:
+            bits = (bits << 1) | 1
+            rng[0] = mid
+        else:
+            bits <<= 1
+            rng[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(_GEOHASH_BASE32[bits])
+            bits, bit_count = 0, 0
+    return "".join(chars)
+
+
+def normalize_text(text: str) -> str:
+    return re.sub(r"\s+", " ", re.sub(r"[^\w\s,.-]", "", str(text).lower())).strip(" .,")
+
+
+def _coordinates(params: Dict[str, Any]) -> Optional[Tuple[float, float]]:
+    lat = next((params[k] for k in _LAT_KEYS if k in params), None)
+    lon = next((params[k] for k in _LON_KEYS if k in params), None)
+    if lat is None or lon is None:
+        return None
+    try:
+        return float(lat), float(lon)
+    except (TypeError, ValueError):
+        return None
+
+
+class ToolResultCache:
+    """TTL cache with an LRU cap on entry count and approximate memory size."""
+    def __init__(self, ttls: Optional[Dict[str, float]] = None, default_ttl: float = DEFAULT_TTL,
+                 max_entries: int = DEFAULT_MAX_ENTRIES, max_bytes: int = DEFAULT_MAX_BYTES,
+                 geohash_precision: int = DEFAULT_GEOHASH_PRECISION, backend: Any = None):
+        self.ttls = dict(DEFAULT_TTLS)
+        if ttls:
+            self.ttls.update(ttls)
+        self.default_ttl = default_ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.geohash_precision = geohash_precision
+        self._entries: "OrderedDict[str, Tuple[Any, float, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = Lock()
+        self.backend = backend
+        self.hits = 0
+        self.remote_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def key_for(self, tool_name: str, query: Any) -> str:
+        """Build the cache key for a tool call from its query string or parameter dict.
+
+        Keys built elsewhere must also start with "<tool_name>:" so entries
+        copied from the shared backend get the tool's TTL.
+        """
+        if isinstance(query, dict):
+            coords = _coordinates(query)
+            rest = {k: v for k, v in query.items() if k not in _LAT_KEYS + _LON_KEYS}
+            if coords:
+                cell = geohash_encode(coords[0], coords[1], self.geohash_precision)
+                return f"{tool_name}:geo:{cell}:{json.dumps(rest, sort_keys=True, default=str)}"
+            return f"{tool_name}:params:{normalize_text(json.dumps(rest, sort_keys=True, default=str))}"
+        return f"{tool_name}:text:{normalize_text(query)}"
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self._get_local(key)
+        if value is None and self.backend is not None:
+            value = self._get_remote(key)
+        return value
+
+    def set(self, key: str, value: Any, tool_name: Optional[str] = None) -> None:
+        self._set_local(key, value, tool_name)
+        if self.backend is not None:
+            self._set_remote(key, value, tool_name)
+
+    async def get_async(self, key: str) -> Optional[Any]:
+        """Like get, but a shared-backend lookup runs on a worker thread."""
+        value = self._get_local(key)
+        if value is None and self.backend is not None:
+            value = await asyncio.to_thread(self._get_remote, key)
+        return value
+
+    async def set_async(self, key: str, value: Any, tool_name: Optional[str] = None) -> None:
+        self._set_local(key, value, tool_name)
+        if self.backend is not None:
+            await asyncio.to_thread(self._set_remote, key, value, tool_name)
+
+    def _get_local(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] < time.monotonic():
+                self._remove(key)
+                entry = None
+            if entry is None:
+                if self.backend is None:
+                    self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def _get_remote(self, key: str) -> Optional[Any]:
+        try:
+            value = self.backend.get(f"toolcache:{key}")
+        except Exception as ex:
+            print(f"Shared tool cache lookup failed: {ex}")
+            value = None
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.remote_hits += 1
+        # Keep a local copy for the tool's TTL; keys start with the tool name (see key_for)
+        self._set_local(key, value, key.partition(":")[0])
+        return value
+
+    def _set_remote(self, key: str, value: Any, tool_name: Optional[str]) -> None:
+        try:
+            self.backend.set(f"toolcache:{key}", value, ttl=self.ttls.get(tool_name, self.default_ttl))
+        except Exception as ex:
+            print(f"Shared tool cache write failed: {ex}")
+
+    def _set_local(self, key: str, value: Any, tool_name: Optional[str]) -> None:
+        ttl = self.ttls.get(tool_name, self.default_ttl)
+        size = len(json.dumps(value, default=str))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, time.monotonic() + ttl, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def _remove(self, key: str) -> None:
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        hits = self.hits + self.remote_hits
+        lookups = hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "hits": self.hits,
+            "remote_hits": self.remote_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": hits / lookups if lookups else 0.0,
+        }
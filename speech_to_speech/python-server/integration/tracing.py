@@ -0,0 +1,206 @@
+# tracing.py
+"""OpenTelemetry tracing for S2S sessions and tool integrations.
+
+Tracing is off unless S2S_TRACE_EXPORTER is set:
+
+    console  print finished spans to stdout, one JSON object per line
+    file     append spans as JSON lines to S2S_TRACE_FILE (offline analysis)
+    otlp     export over OTLP; endpoint and headers come from the standard
+             OTEL_EXPORTER_OTLP_* variables (requires opentelemetry-exporter-otlp)
+
+If a tracer provider is already installed (e.g. by opentelemetry-instrument
+or the ADOT distro) spans go to it instead. Sampling follows the standard
+OTEL_TRACES_SAMPLER variables. Without the opentelemetry packages every
+helper here is a no-op.
+"""
+import asyncio
+import functools
+import os
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict
+
+try:
+    from opentelemetry import context as otel_context, propagate, trace
+    from opentelemetry.trace import Status, StatusCode
+except ImportError:
+    trace = None
+
+TRACE_EXPORTER = os.getenv("S2S_TRACE_EXPORTER", "none").lower()
+TRACE_FILE = os.getenv("S2S_TRACE_FILE", "s2s_traces.jsonl")
+# Audio chunks arrive every ~32 ms per session; tracing each one is opt-in
+TRACE_AUDIO = os.getenv("S2S_TRACE_AUDIO", "false").lower() == "true"
+SERVICE_NAME = os.getenv("OTEL_SERVICE_NAME", "nova-s2s-server")
+
+_provider = None
+
+
+class _NoopSpan:
+    def set_attribute(self, key, value):
+        pass
+
+    def record_exception(self, exception):
+        pass
+
+    def end(self):
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+def _file_exporter(path):
+    from opentelemetry.sdk.trace.export import SpanExporter, SpanExportResult
+
+    class JsonLinesSpanExporter(SpanExporter):
+        def __init__(self):
+            self._lock = threading.Lock()
+
+        def export(self, spans):
+            lines = "".join(s.to_json(indent=None) + "\n" for s in spans)
+            with self._lock, open(path, "a", encoding="utf-8") as f:
+                f.write(lines)
+            return SpanExportResult.SUCCESS
+
+    return JsonLinesSpanExporter()
+
+
+def _create_exporter(name):
+    if name == "console":
+        from opentelemetry.sdk.trace.export import ConsoleSpanExporter
+        return ConsoleSpanExporter(formatter=lambda s: s.to_json(indent=None) + os.linesep)
+    if name == "file":
+        return _file_exporter(TRACE_FILE)
+    if name == "otlp":
+        try:
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        except ImportError:
+            from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
+        return OTLPSpanExporter()
+    raise ValueError(f"Unsupported S2S_TRACE_EXPORTER: {name}")
+
+
+def setup_tracing(exporter: str = TRACE_EXPORTER) -> bool:
+    """Install a tracer provider for the configured exporter. Returns True if spans are exported."""
+    global _provider
+    if trace is None:
+        if exporter != "none":
+            print(f"S2S_TRACE_EXPORTER={exporter} but opentelemetry is not installed, tracing disabled")
+        return False
+    if not isinstance(trace.get_tracer_provider(), trace.ProxyTracerProvider):
+        print("Using the already configured OpenTelemetry tracer provider")
+        return True
+    if exporter == "none":
+        return False
+    try:
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+
+        provider = TracerProvider(resource=Resource.create({"service.name": SERVICE_NAME}))
+        provider.add_span_processor(BatchSpanProcessor(_create_exporter(exporter)))
+        trace.set_tracer_provider(provider)
+        _provider = provider
+        print(f"Tracing enabled with {exporter} exporter")
+        return True
+    except Exception as ex:
+        print(f"Failed to set up tracing: {ex}")
+        return False
+
+
+def shutdown_tracing():
+    """Flush pending spans."""
+    if _provider is not None:
+        _provider.shutdown()
+
+
+def _tracer():
+    return trace.get_tracer("s2s")
+
+
+def start_span(name: str, parent=None, root: bool = False, **attributes):
+    """Start a span that is not made current; the caller must end() it.
+
+    root=True starts a new trace instead of nesting under the current span.
+    """
+    if trace is None:
+        return _NOOP_SPAN
+    if root:
+        parent = otel_context.Context()
+    return _tracer().start_span(name, context=parent, attributes=_clean(attributes))
+
+
+def context_with(span_obj):
+    """Context whose current span is span_obj, for use as the parent of later spans."""
+    if trace is None or span_obj is _NOOP_SPAN:
+        return None
+    return trace.set_span_in_context(span_obj)
+
+
+def attach_context(ctx):
+    """Make ctx current in this task or thread; returns a token for detach_context."""
+    if trace is None or ctx is None:
+        return None
+    return otel_context.attach(ctx)
+
+
+def detach_context(token):
+    if token is not None:
+        otel_context.detach(token)
+
+
+@contextmanager
+def span(name: str, parent=None, **attributes):
+    """Run the block in a new current span, child of parent (a Context) or the current span."""
+    if trace is None:
+        yield _NOOP_SPAN
+        return
+    with _tracer().start_as_current_span(name, context=parent, attributes=_clean(attributes),
+                                         record_exception=False, set_status_on_exception=False) as current:
+        try:
+            yield current
+        except BaseException as ex:
+            if not isinstance(ex, (asyncio.CancelledError, GeneratorExit)):
+                current.record_exception(ex)
+                current.set_status(Status(StatusCode.ERROR, str(ex)))
+            raise
+
+
+def traced(name: str):
+    """Decorator wrapping each call of a sync or async function in a span."""
+    def decorator(fn):
+        if asyncio.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with span(name):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def set_attributes(**attributes):
+    """Add attributes to the current span."""
+    if trace is None:
+        return
+    current = trace.get_current_span()
+    for key, value in _clean(attributes).items():
+        current.set_attribute(key, value)
+
+
+def inject_headers(parent=None) -> Dict[str, str]:
+    """W3C trace context headers (traceparent, tracestate, baggage) for the current span."""
+    carrier: Dict[str, str] = {}
+    if trace is not None:
+        propagate.inject(carrier, context=parent)
+    return carrier
+
+
+def _clean(attributes: Dict[str, Any]) -> Dict[str, Any]:
+    return {k: (v if isinstance(v, (str, bool, int, float)) else str(v))
+            for k, v in attributes.items() if v is not None}
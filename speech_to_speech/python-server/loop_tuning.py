@@ -0,0 +1,45 @@
+"""Opt-in event loop and WebSocket tuning for the S2S server.
+
+Defaults match plain asyncio and the websockets library, so nothing changes
+unless configured:
+
+    EVENT_LOOP=uvloop        use uvloop when installed (pip install uvloop)
+    WS_MAX_SIZE=262144       largest accepted client message in bytes
+    WS_WRITE_LIMIT=131072    send buffer high-water mark in bytes
+    WS_COMPRESSION=none      disable permessage-deflate
+
+Base64 PCM audio barely compresses, so per-message deflate mostly costs CPU.
+Measure with benchmarks/ws_relay_bench.py before changing production.
+"""
+import asyncio
+import os
+
+EVENT_LOOP = os.getenv("EVENT_LOOP", "asyncio").lower()
+WS_MAX_SIZE = int(os.getenv("WS_MAX_SIZE", str(2 ** 20)))
+WS_WRITE_LIMIT = int(os.getenv("WS_WRITE_LIMIT", str(2 ** 15)))
+WS_COMPRESSION = os.getenv("WS_COMPRESSION", "deflate").lower()
+
+
+def install_event_loop(name: str = EVENT_LOOP) -> str:
+    """Set the event loop policy for asyncio.run() and return the loop actually used."""
+    if name == "uvloop":
+        try:
+            import uvloop
+        except ImportError:
+            print("EVENT_LOOP=uvloop but uvloop is not installed, using asyncio")
+            return "asyncio"
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+        return "uvloop"
+    if name != "asyncio":
+        print(f"Unknown EVENT_LOOP {name}, using asyncio")
+    return "asyncio"
+
+
+def websocket_options(max_size: int = WS_MAX_SIZE, write_limit: int = WS_WRITE_LIMIT,
+                      compression: str = WS_COMPRESSION) -> dict:
+    """Keyword arguments for websockets.serve()."""
+    return {
+        "max_size": max_size,
+        "write_limit": write_limit,
+        "compression": None if compression in ("none", "off", "") else compression,
+    }
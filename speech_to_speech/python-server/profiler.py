@@ -0,0 +1,151 @@
+"""On-demand sampling profiler for a running S2S server.
+
+Disabled unless S2S_PROFILER_ENABLED=true. When enabled, a profile can be
+taken without restarting the server:
+
+    curl "http://localhost:$HEALTH_PORT/debug/profile?seconds=30"
+    kill -USR2 <pid>          # S2S_PROFILE_DEFAULT_SECONDS
+
+A background thread samples the stacks of every thread (the event loop and
+the asyncio.to_thread / executor workers) at S2S_PROFILE_INTERVAL and writes
+folded stacks to S2S_PROFILE_DIR, ready for flamegraph.pl or speedscope.
+The file name and a .json sidecar record the live session count.
+"""
+import asyncio
+import json
+import os
+import signal
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Callable, Dict, Optional
+
+PROFILER_ENABLED = os.getenv("S2S_PROFILER_ENABLED", "false").lower() == "true"
+PROFILE_DIR = os.getenv("S2S_PROFILE_DIR", "/tmp/s2s-profiles")
+PROFILE_INTERVAL = float(os.getenv("S2S_PROFILE_INTERVAL", "0.01"))
+PROFILE_DEFAULT_SECONDS = float(os.getenv("S2S_PROFILE_DEFAULT_SECONDS", "30"))
+PROFILE_MAX_SECONDS = float(os.getenv("S2S_PROFILE_MAX_SECONDS", "300"))
+
+_running = threading.Lock()
+_signal_tasks = set()
+
+
+class ProfilerBusy(RuntimeError):
+    pass
+
+
+class SamplingProfiler:
+    """Samples all thread stacks on an interval and counts identical stacks."""
+    def __init__(self, interval: float = PROFILE_INTERVAL):
+        self.interval = interval
+        self.samples = 0
+        self.stacks: Counter = Counter()
+
+    @staticmethod
+    def _frame_name(frame) -> str:
+        code = frame.f_code
+        return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+    def sample(self):
+        own = threading.get_ident()
+        names = {t.ident: t.name for t in threading.enumerate()}
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(self._frame_name(frame))
+                frame = frame.f_back
+            stack.append(names.get(thread_id, f"thread-{thread_id}"))
+            self.stacks[";".join(reversed(stack))] += 1
+        self.samples += 1
+
+    def run(self, seconds: float) -> "SamplingProfiler":
+        """Sample for the given duration. Blocking; call from a worker thread."""
+        deadline = time.monotonic() + seconds
+        next_sample = time.monotonic()
+        while next_sample < deadline:
+            self.sample()
+            next_sample += self.interval
+            time.sleep(max(0.0, next_sample - time.monotonic()))
+        return self
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+async def _run_in_own_thread(fn, *args):
+    """Like asyncio.to_thread, but on a dedicated thread so a saturated executor cannot delay it."""
+    loop = asyncio.get_running_loop()
+    done = loop.create_future()
+
+    def worker():
+        try:
+            result = fn(*args)
+            loop.call_soon_threadsafe(done.set_result, result)
+        except Exception as ex:
+            loop.call_soon_threadsafe(done.set_exception, ex)
+
+    threading.Thread(target=worker, name="s2s-profiler", daemon=True).start()
+    return await done
+
+
+async def profile(seconds: float = PROFILE_DEFAULT_SECONDS,
+                  session_count: Optional[Callable[[], int]] = None) -> Dict:
+    """Profile the whole process for `seconds` and write the folded stacks to PROFILE_DIR."""
+    if not _running.acquire(blocking=False):
+        raise ProfilerBusy("A profile is already running")
+    try:
+        seconds = max(0.1, min(seconds, PROFILE_MAX_SECONDS))
+        sessions_start = session_count() if session_count else None
+        started_at = time.strftime("%Y%m%d-%H%M%S")
+        sampler = await _run_in_own_thread(SamplingProfiler().run, seconds)
+        sessions_end = session_count() if session_count else None
+
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        name = f"s2s-profile-{started_at}-pid{os.getpid()}"
+        if sessions_start is not None:
+            name += f"-sessions{sessions_start}"
+        path = os.path.join(PROFILE_DIR, f"{name}.folded")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(sampler.folded())
+        metadata = {
+            "path": path,
+            "seconds": seconds,
+            "interval": sampler.interval,
+            "samples": sampler.samples,
+            "unique_stacks": len(sampler.stacks),
+            "sessions_start": sessions_start,
+            "sessions_end": sessions_end,
+            "pid": os.getpid(),
+        }
+        with open(os.path.join(PROFILE_DIR, f"{name}.json"), "w", encoding="utf-8") as f:
+            json.dump(metadata, f, indent=2)
+        print(f"Profile written to {path} ({sampler.samples} samples, {sessions_start} sessions)")
+        return metadata
+    finally:
+        _running.release()
+
+
+def install_signal_handler(session_count: Optional[Callable[[], int]] = None, sig=getattr(signal, "SIGUSR2", None)):
+    """Start a PROFILE_DEFAULT_SECONDS profile whenever the process receives sig (Unix only)."""
+    if sig is None:
+        return False
+    loop = asyncio.get_running_loop()
+
+    def on_signal():
+        async def run():
+            try:
+                await profile(PROFILE_DEFAULT_SECONDS, session_count)
+            except ProfilerBusy as ex:
+                print(ex)
+        task = loop.create_task(run())
+        _signal_tasks.add(task)
+        task.add_done_callback(_signal_tasks.discard)
+
+    try:
+        loop.add_signal_handler(sig, on_signal)
+    except (NotImplementedError, RuntimeError):
+        return False
+    return True
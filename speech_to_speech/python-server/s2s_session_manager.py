@@ -1,5 +1,6 @@
 import asyncio
 import json
+from contextlib import nullcontext
 import base64
 import warnings
 import uuid
@@ -8,14 +9,26 @@ import time
 from aws_sdk_bedrock_runtime.client import BedrockRuntimeClient, InvokeModelWithBidirectionalStreamOperationInput
 from aws_sdk_bedrock_runtime.models import InvokeModelWithBidirectionalStreamInputChunk, BidirectionalInputPayloadPart
 from aws_sdk_bedrock_runtime.config import Config
-from smithy_aws_core.identity.environment import EnvironmentCredentialsResolver
-from integration import inline_agent, bedrock_knowledge_bases as kb, agent_core
+import shared_state
+from transcript_sink import SessionTranscript, get_sink
+from session_recorder import recorder_for
+from aws_credentials import get_credentials_resolver
+from integration import inline_agent, bedrock_knowledge_bases as kb, agent_core, booking_formatter
+from integration.tracing import TRACE_AUDIO, attach_context, context_with, set_attributes, span, start_span, traced
 
 # Suppress warnings
 warnings.filterwarnings("ignore")
 
 DEBUG = False
 
+# Process-wide Bedrock stream outcomes, reported by the readiness and metrics endpoints
+BEDROCK_STATUS = {
+    "streams_opened": 0,
+    "stream_failures": 0,
+    "consecutive_failures": 0,
+    "last_error": None,
+}
+
 def debug_print(message):
     """Print only if debug mode is enabled"""
     if DEBUG:
@@ -25,10 +38,18 @@ def debug_print(message):
 class S2sSessionManager:
     """Manages bidirectional streaming with AWS Bedrock using asyncio"""
     
-    def __init__(self, region, model_id='amazon.nova-sonic-v1:0', mcp_client=None, strands_agent=None):
-        """Initialize the stream manager."""
+    def __init__(self, region, model_id='amazon.nova-sonic-v1:0', mcp_client=None, strands_agent=None, text_only=False):
+        """Initialize the stream manager.
+
+        text_only sessions take user text instead of audio and never forward
+        the model's audio output to the client.
+        """
         self.model_id = model_id
         self.region = region
+        self.text_only = text_only
+        self.session_id = str(uuid.uuid4())
+        self._registered = False
+        self._closed = False
         
         # Audio and output queues
         self.audio_input_queue = asyncio.Queue()
@@ -49,12 +70,22 @@ class S2sSessionManager:
         self.mcp_loc_client = mcp_client
         self.strands_agent = strands_agent
 
+        # Write-behind transcript and turn latency records, if enabled
+        sink = get_sink()
+        self.transcript = SessionTranscript(sink, self.session_id) if sink else None
+        # Full inbound/outbound event recording for replay (S2S_RECORD_DIR)
+        self.recorder = recorder_for(self.session_id, model_id, text_only=text_only)
+
+        # Root span for the session; per-event spans are its children
+        self.session_span = start_span("s2s.session", root=True, session_id=self.session_id, model_id=model_id)
+        self.trace_context = context_with(self.session_span)
+
     def _initialize_client(self):
         """Initialize the Bedrock client."""
         config = Config(
             endpoint_uri=f"https://bedrock-runtime.{self.region}.amazonaws.com",
             region=self.region,
-            aws_credentials_identity_resolver=EnvironmentCredentialsResolver(),
+            aws_credentials_identity_resolver=get_credentials_resolver(),
         )
         self.bedrock_client = BedrockRuntimeClient(config=config)
 
@@ -99,12 +130,23 @@ class S2sSessionManager:
                 InvokeModelWithBidirectionalStreamOperationInput(model_id=self.model_id)
             )
             self.is_active = True
+            BEDROCK_STATUS["streams_opened"] += 1
+            BEDROCK_STATUS["consecutive_failures"] = 0
+
+            # Publish session metadata and counters to the shared-state backend
+            try:
+                await shared_state.run(shared_state.register_session, self.session_id,
+                                       {"model_id": self.model_id, "region": self.region})
+                self._registered = True
+            except Exception as e:
+                debug_print(f"Failed to register session: {e}")
             
             # Start listening for responses
             self.response_task = asyncio.create_task(self._process_responses())
 
             # Start processing audio input
-            asyncio.create_task(self._process_audio_input())
+            if not self.text_only:
+                asyncio.create_task(self._process_audio_input())
             
             # Wait a bit to ensure everything is set up
             await asyncio.sleep(0.1)
@@ -113,6 +155,9 @@ class S2sSessionManager:
             return self
         except Exception as e:
             self.is_active = False
+            BEDROCK_STATUS["stream_failures"] += 1
+            BEDROCK_STATUS["consecutive_failures"] += 1
+            BEDROCK_STATUS["last_error"] = str(e)
             print(f"Failed to initialize stream: {str(e)}")
             raise
     
@@ -129,17 +174,24 @@ class S2sSessionManager:
             event = InvokeModelWithBidirectionalStreamInputChunk(
                 value=BidirectionalInputPayloadPart(bytes_=event_json.encode('utf-8'))
             )
-            await self.stream.input_stream.send(event)
+            event_name = next(iter(event_data["event"]), None)
+            if event_name == "audioInput" and not TRACE_AUDIO:
+                await self.stream.input_stream.send(event)
+            else:
+                with span("s2s.send_raw_event", event=event_name, bytes=len(event_json)):
+                    await self.stream.input_stream.send(event)
 
             # Close session
             if "sessionEnd" in event_data["event"]:
-                self.close()
+                await self.close()
             
         except Exception as e:
             debug_print(f"Error sending event: {str(e)}")
     
     async def _process_audio_input(self):
         """Process audio input from the queue and send to Bedrock."""
+        # This task's spans belong to the session trace
+        attach_context(self.trace_context)
         while self.is_active:
             try:
                 # Get audio data from the queue
@@ -168,6 +220,55 @@ class S2sSessionManager:
                     import traceback
                     traceback.print_exc()
     
+    async def handle_client_event(self, event_type, data):
+        """Route one event from the client to Bedrock."""
+        if self.recorder:
+            self.recorder.record("in", data)
+
+        if self.text_only:
+            if event_type in ('audioInput', 'contentStart') and (
+                    event_type == 'audioInput' or data['event']['contentStart'].get('type') == 'AUDIO'):
+                debug_print(f"Ignoring audio {event_type} in a text-only session")
+                return
+            if event_type == 'promptStart':
+                # The model always speaks; text clients need not know its audio settings
+                data['event']['promptStart'].setdefault("audioOutputConfiguration", S2sEvent.DEFAULT_AUDIO_OUTPUT_CONFIG)
+
+        # Compact user text turn, expanded into the TEXT content events the model expects
+        if event_type == 'chatInput':
+            await self.send_user_text(data['event']['chatInput']['content'])
+            return
+
+        # Store prompt name and content names if provided
+        if event_type == 'promptStart':
+            self.prompt_name = data['event']['promptStart']['promptName']
+        elif event_type == 'contentStart' and data['event']['contentStart'].get('type') == 'AUDIO':
+            self.audio_content_name = data['event']['contentStart']['contentName']
+
+        # Handle audio input separately
+        if event_type == 'audioInput':
+            # Extract audio data
+            prompt_name = data['event']['audioInput']['promptName']
+            content_name = data['event']['audioInput']['contentName']
+            audio_base64 = data['event']['audioInput']['content']
+
+            # Add to the audio queue
+            self.add_audio_chunk(prompt_name, content_name, audio_base64)
+        else:
+            # Send other events directly to Bedrock
+            await self.send_raw_event(data)
+
+    async def send_user_text(self, text):
+        """Send one interactive user text turn to the model."""
+        if not self.prompt_name:
+            # Text has to belong to a prompt; tell the client instead of sending promptName: null
+            await self.output_queue.put({"event": {"chatInputRejected": {"reason": "NO_ACTIVE_PROMPT"}}})
+            return
+        content_name = str(uuid.uuid4())
+        await self.send_raw_event(S2sEvent.content_start_text(self.prompt_name, content_name, role="USER", interactive=True))
+        await self.send_raw_event(S2sEvent.text_input(self.prompt_name, content_name, text))
+        await self.send_raw_event(S2sEvent.content_end(self.prompt_name, content_name))
+
     def add_audio_chunk(self, prompt_name, content_name, audio_data):
         """Add an audio chunk to the queue."""
         # The audio_data is already a base64 string from the frontend
@@ -179,69 +280,42 @@ class S2sSessionManager:
     
     async def _process_responses(self):
         """Process incoming responses from Bedrock."""
+        # This task's spans belong to the session trace
+        attach_context(self.trace_context)
         while self.is_active:
             try:            
                 output = await self.stream.await_output()
                 result = await output[1].receive()
                 
                 if result.value and result.value.bytes_:
+                    # Text-only sessions drop audio frames before paying to parse them. This relies on
+                    # Bedrock sending {"event":{"audioOutput":... with the event name first; frames
+                    # serialized any other way are still dropped after parsing below.
+                    if self.text_only and b'"audioOutput"' in result.value.bytes_[:48]:
+                        continue
                     response_data = result.value.bytes_.decode('utf-8')
                     
                     json_data = json.loads(response_data)
+                    if self.text_only and 'audioOutput' in json_data.get('event', {}):
+                        continue
                     json_data["timestamp"] = int(time.time() * 1000)  # Milliseconds since epoch
+                    if self.recorder:
+                        self.recorder.record("out", json_data)
                     
                     event_name = None
                     if 'event' in json_data:
                         event_name = list(json_data["event"].keys())[0]
                         # if event_name == "audioOutput":
                         #     print(json_data)
-                        
-                        # Handle tool use detection
-                        if event_name == 'toolUse':
-                            self.toolUseContent = json_data['event']['toolUse']
-                            self.toolName = json_data['event']['toolUse']['toolName']
-                            self.toolUseId = json_data['event']['toolUse']['toolUseId']
-                            debug_print(f"Tool use detected: {self.toolName}, ID: {self.toolUseId}, "+ json.dumps(json_data['event']))
-
-                        # Process tool use when content ends
-                        elif event_name == 'contentEnd' and json_data['event'][event_name].get('type') == 'TOOL':
-                            prompt_name = json_data['event']['contentEnd'].get("promptName")
-                            debug_print("Processing tool use and sending result")
-                            toolResult = await self.processToolUse(self.toolName, self.toolUseContent)
-                                
-                            # Send tool start event
-                            toolContent = str(uuid.uuid4())
-                            tool_start_event = S2sEvent.content_start_tool(prompt_name, toolContent, self.toolUseId)
-                            await self.send_raw_event(tool_start_event)
-                            
-                            # Also send tool start event to WebSocket client
-                            tool_start_event_copy = tool_start_event.copy()
-                            tool_start_event_copy["timestamp"] = int(time.time() * 1000)
-                            await self.output_queue.put(tool_start_event_copy)
-                            
-                            # Send tool result event
-                            if isinstance(toolResult, dict):
-                                content_json_string = json.dumps(toolResult)
-                            else:
-                                content_json_string = toolResult
-
-                            tool_result_event = S2sEvent.text_input_tool(prompt_name, toolContent, content_json_string)
-                            print("Tool result", tool_result_event)
-                            await self.send_raw_event(tool_result_event)
-                            
-                            # Also send tool result event to WebSocket client
-                            tool_result_event_copy = tool_result_event.copy()
-                            tool_result_event_copy["timestamp"] = int(time.time() * 1000)
-                            await self.output_queue.put(tool_result_event_copy)
-
-                            # Send tool content end event
-                            tool_content_end_event = S2sEvent.content_end(prompt_name, toolContent)
-                            await self.send_raw_event(tool_content_end_event)
-                            
-                            # Also send tool content end event to WebSocket client
-                            tool_content_end_event_copy = tool_content_end_event.copy()
-                            tool_content_end_event_copy["timestamp"] = int(time.time() * 1000)
-                            await self.output_queue.put(tool_content_end_event_copy)
+                        if self.transcript:
+                            self.transcript.on_output_event(event_name, json_data["event"][event_name], json_data["timestamp"])
+                        traced_event = event_name != "audioOutput" or TRACE_AUDIO
+                        with (span("s2s.model_output", event=event_name)
+                              if traced_event else nullcontext()):
+                            await self._handle_output_event(json_data, event_name)
+                        if self.text_only and event_name in ('contentStart', 'contentEnd') and \
+                                json_data['event'][event_name].get('type') == 'AUDIO':
+                            continue
                     
                     # Put the response in the output queue for forwarding to the frontend
                     await self.output_queue.put(json_data)
@@ -263,14 +337,70 @@ class S2sSessionManager:
                 break
 
         self.is_active = False
-        self.close()
+        await self.close()
 
+    async def _handle_output_event(self, json_data, event_name):
+        """Track tool use and answer it once the model finishes the tool content."""
+        if event_name == 'toolUse':
+            self.toolUseContent = json_data['event']['toolUse']
+            self.toolName = json_data['event']['toolUse']['toolName']
+            self.toolUseId = json_data['event']['toolUse']['toolUseId']
+            debug_print(f"Tool use detected: {self.toolName}, ID: {self.toolUseId}, "+ json.dumps(json_data['event']))
+
+        # Process tool use when content ends
+        elif event_name == 'contentEnd' and json_data['event'][event_name].get('type') == 'TOOL':
+            prompt_name = json_data['event']['contentEnd'].get("promptName")
+            debug_print("Processing tool use and sending result")
+            tool_started = time.perf_counter()
+            toolResult = await self.processToolUse(self.toolName, self.toolUseContent)
+            tool_ms = (time.perf_counter() - tool_started) * 1000
+            if self.transcript:
+                self.transcript.on_tool_result(self.toolName, self.toolUseId, toolResult, tool_ms, int(time.time() * 1000))
+            if self.recorder:
+                self.recorder.record_tool(self.toolName, self.toolUseId, toolResult, tool_ms)
+
+            # Send tool start event
+            toolContent = str(uuid.uuid4())
+            tool_start_event = S2sEvent.content_start_tool(prompt_name, toolContent, self.toolUseId)
+            await self.send_raw_event(tool_start_event)
+
+            # Also send tool start event to WebSocket client
+            tool_start_event_copy = tool_start_event.copy()
+            tool_start_event_copy["timestamp"] = int(time.time() * 1000)
+            await self.output_queue.put(tool_start_event_copy)
+
+            # Send tool result event
+            if isinstance(toolResult, dict):
+                content_json_string = json.dumps(toolResult)
+            else:
+                content_json_string = toolResult
+
+            tool_result_event = S2sEvent.text_input_tool(prompt_name, toolContent, content_json_string)
+            print("Tool result", tool_result_event)
+            await self.send_raw_event(tool_result_event)
+
+            # Also send tool result event to WebSocket client
+            tool_result_event_copy = tool_result_event.copy()
+            tool_result_event_copy["timestamp"] = int(time.time() * 1000)
+            await self.output_queue.put(tool_result_event_copy)
+
+            # Send tool content end event
+            tool_content_end_event = S2sEvent.content_end(prompt_name, toolContent)
+            await self.send_raw_event(tool_content_end_event)
+
+            # Also send tool content end event to WebSocket client
+            tool_content_end_event_copy = tool_content_end_event.copy()
+            tool_content_end_event_copy["timestamp"] = int(time.time() * 1000)
+            await self.output_queue.put(tool_content_end_event_copy)
+
+    @traced("s2s.process_tool_use")
     async def processToolUse(self, toolName, toolUseContent):
         """Return the tool result"""
         print(f"Tool Use Content: {toolUseContent}")
+        set_attributes(tool_name=toolName, tool_use_id=self.toolUseId, session_id=self.session_id)
 
         toolName = toolName.lower()
-        content, result = None, None
+        content, result, query_json = None, None, None
         try:
             if toolUseContent.get("content"):
                 # Parse the JSON string in the content field
@@ -299,19 +429,32 @@ class S2sSessionManager:
             # Strands Agent integration - weather questions
             if toolName == "externalagent":
                 if self.strands_agent:
-                    result = self.strands_agent.query(content)
+                    direct_tool = query_json.get("tool") if isinstance(query_json, dict) else None
+                    if direct_tool and self.strands_agent.has_tool(direct_tool):
+                        # The tool is already known, skip the agent's reasoning hop
+                        result = await self.strands_agent.call_tool_async(direct_tool, content)
+                    else:
+                        result = await asyncio.to_thread(self.strands_agent.query, content, self.session_id)
+
+            # Strands direct tool call - Sonic tool named after a Strands tool
+            elif self.strands_agent and self.strands_agent.has_tool(toolName):
+                result = await self.strands_agent.call_tool_async(toolName, content)
 
             # Bedrock Agents integration - Bookings
             if toolName == "getbookingdetails":
                 try:
                     # Pass the tool use content (JSON string) directly to the agent
-                    result = await inline_agent.invoke_agent(content)
+                    result = await inline_agent.invoke_agent(content, session_id=self.session_id)
                     # Try to parse and format if needed
                     try:
                         booking_json = json.loads(result)
-                        if "bookings" in booking_json:
+                        formatted = booking_formatter.format_booking_result(booking_json)
+                        if formatted is not None:
+                            result = formatted
+                        elif booking_formatter.LLM_FALLBACK and "bookings" in booking_json:
                             result = await inline_agent.invoke_agent(
-                                f"Format this booking information for the user: {result}"
+                                f"Format this booking information for the user: {result}",
+                                session_id=self.session_id
                             )
                     except Exception:
                         pass  # Not JSON, just return as is
@@ -333,10 +476,32 @@ class S2sSessionManager:
     
     async def close(self):
         """Close the stream properly."""
-        if not self.is_active:
+        if self.session_span is not None:
+            self.session_span.end()
+            self.session_span = None
+        if self.transcript:
+            self.transcript.close()
+        if self.recorder:
+            self.recorder.close()
+
+        # Runs once, whether the client, the server or the model stream ended the session
+        # (is_active is already False when the stream ended on its own)
+        if self._closed:
             return
-            
+        self._closed = True
         self.is_active = False
+
+        if self._registered:
+            self._registered = False
+            try:
+                await shared_state.run(shared_state.unregister_session, self.session_id)
+            except Exception as e:
+                debug_print(f"Failed to unregister session: {e}")
+
+        # Release this session's agent conversations
+        inline_agent.release_orchestrator(self.session_id)
+        if self.strands_agent:
+            self.strands_agent.release_session(self.session_id)
         
         # Clear audio queue to prevent processing old audio data
         while not self.audio_input_queue.empty():
@@ -368,7 +533,8 @@ class S2sSessionManager:
             except Exception as e:
                 debug_print(f"Error closing stream: {e}")
         
-        if self.response_task and not self.response_task.done():
+        # close() may be called from the response task itself when the stream ends
+        if self.response_task and not self.response_task.done() and self.response_task is not asyncio.current_task():
             self.response_task.cancel()
             try:
                 await self.response_task
@@ -4,39 +4,22 @@ import json
 import logging
 import warnings
 import sys
-from s2s_session_manager import S2sSessionManager
+from s2s_session_manager import S2sSessionManager, BEDROCK_STATUS
 import argparse
-import http.server
-import threading
 import os
-import boto3
+import time
 from http import HTTPStatus
 from integration.mcp_client import McpLocationClient
-from integration.strands_agent import StrandsAgent
-
-def setup_aws_credentials_globally():
-    """Set up AWS credentials globally for all Smithy-based components."""
-    if os.getenv("AWS_ACCESS_KEY_ID") and os.getenv("AWS_SECRET_ACCESS_KEY"):
-        print("AWS credentials already available in environment")
-        return
-    
-    try:
-        print("Setting up AWS credentials from credential chain (supports IAM roles)...")
-        session = boto3.Session(region_name=os.getenv("AWS_REGION", "us-east-1"))
-        credentials = session.get_credentials()
-        if credentials:
-            os.environ["AWS_ACCESS_KEY_ID"] = credentials.access_key
-            os.environ["AWS_SECRET_ACCESS_KEY"] = credentials.secret_key
-            if credentials.token:
-                os.environ["AWS_SESSION_TOKEN"] = credentials.token
-            print("Successfully set up AWS credentials globally from credential chain")
-        else:
-            print("WARNING: No credentials found in AWS credential chain")
-    except Exception as e:
-        print(f"ERROR: Failed to set up AWS credentials: {e}")
-
-# Set up credentials at module import time
-setup_aws_credentials_globally()
+from integration.strands_agent import StrandsAgent, use_shared_cache
+from integration.mcp_launch import LAZY_CONNECT
+import shared_state
+from admission import AdmissionController
+from health_server import HealthServer
+from loop_tuning import install_event_loop, websocket_options
+import profiler
+import transcript_sink
+from aws_credentials import get_credentials_resolver
+from integration.tracing import TRACE_AUDIO, attach_context, context_with, detach_context, setup_tracing, shutdown_tracing, start_span
 
 # Configure logging
 LOGLEVEL = os.environ.get("LOGLEVEL", "INFO").upper()
@@ -101,71 +84,114 @@ def debug_print(message):
 
 MCP_CLIENT = None
 STRANDS_AGENT = None
+ADMISSION = AdmissionController()
+HEALTH_SERVER = None
 
-class HealthCheckHandler(http.server.BaseHTTPRequestHandler):
-    def do_GET(self):
-        client_ip = self.client_address[0]
-        logger.info(
-            f"Health check request received from {client_ip} for path: {self.path}"
-        )
-
-        if self.path == "/health" or self.path == "/":
-            logger.info(f"Responding with 200 OK to health check from {client_ip}")
-            self.send_response(HTTPStatus.OK)
-            self.send_header("Content-Type", "application/json")
-            self.end_headers()
-            response = json.dumps({"status": "healthy"})
-            self.wfile.write(response.encode("utf-8"))
-            logger.info(f"Health check response sent: {response}")
-        else:
-            logger.info(
-                f"Responding with 404 Not Found to request for {self.path} from {client_ip}"
-            )
-            self.send_response(HTTPStatus.NOT_FOUND)
-            self.end_headers()
-
-    def log_message(self, format, *args):
-        # Override to use our logger instead
-        pass
+# Report not-ready after this many Bedrock streams in a row have failed to open
+BEDROCK_MAX_CONSECUTIVE_FAILURES = int(os.getenv("BEDROCK_MAX_CONSECUTIVE_FAILURES", "3"))
+STARTED_AT = time.time()
 
 
-def start_health_check_server(health_host, health_port):
-    """Start the HTTP health check server on port 80."""
-    try:
-        # Create the server with a socket timeout to prevent hanging
-        httpd = http.server.HTTPServer((health_host, health_port), HealthCheckHandler)
-        httpd.timeout = 5  # 5 second timeout
-
-        logger.info(f"Starting health check server on {health_host}:{health_port}")
-
-        # Run the server in a separate thread
-        thread = threading.Thread(target=httpd.serve_forever)
-        thread.daemon = (
-            True  # This ensures the thread will exit when the main program exits
-        )
-        thread.start()
-
-        # Verify the server is running
-        logger.info(
-            f"Health check server started at http://{health_host}:{health_port}/health"
-        )
-        logger.info(f"Health check thread is alive: {thread.is_alive()}")
-
-        # Try to make a local request to verify the server is responding
-        try:
-            import urllib.request
-
-            with urllib.request.urlopen(
-                f"http://localhost:{health_port}/health", timeout=2
-            ) as response:
-                logger.info(
-                    f"Local health check test: {response.status} - {response.read().decode('utf-8')}"
-                )
-        except Exception as e:
-            logger.warning(f"Local health check test failed: {e}")
+def bedrock_state():
+    credentials = get_credentials_resolver().status()
+    healthy = BEDROCK_STATUS["consecutive_failures"] < BEDROCK_MAX_CONSECUTIVE_FAILURES
+    return {"credentials": credentials, "healthy": healthy, **BEDROCK_STATUS}
 
-    except Exception as e:
-        logger.error(f"Failed to start health check server: {e}", exc_info=True)
+
+def health(query=None):
+    return HTTPStatus.OK, {"status": "healthy"}
+
+
+async def shared_session_counts():
+    """Session counts from the shared-state backend, or None if it cannot be reached."""
+    try:
+        return await shared_state.run(shared_state.session_counts)
+    except Exception as ex:
+        debug_print(f"Failed to read shared session counts: {ex}")
+        return None
+
+
+async def readiness(query=None):
+    """Ready once Bedrock is reachable, the MCP-backed integrations have warmed up
+    and the process has spare session capacity."""
+    mcp_warm = {}
+    if MCP_CLIENT:
+        mcp_warm["mcp"] = MCP_CLIENT.warm
+    if STRANDS_AGENT:
+        mcp_warm["strands"] = STRANDS_AGENT.warm
+    bedrock = bedrock_state()
+    if not (bedrock["credentials"]["available"] and bedrock["healthy"]):
+        status = "bedrock_unavailable"
+    elif not all(mcp_warm.values()):
+        status = "warming"
+    elif not ADMISSION.ready:
+        status = "saturated"
+    else:
+        status = "ready"
+    body = {"status": status, "bedrock": bedrock, "warm": mcp_warm, "load": ADMISSION.load(),
+            "sessions": await shared_session_counts()}
+    return (HTTPStatus.OK if status == "ready" else HTTPStatus.SERVICE_UNAVAILABLE), body
+
+
+async def metrics(query=None):
+    """Prometheus text exposition of session, Bedrock and integration counters."""
+    load = ADMISSION.load()
+    counts = await shared_session_counts()
+    samples = [
+        ("s2s_uptime_seconds", "gauge", time.time() - STARTED_AT),
+        ("s2s_sessions_active", "gauge", load["active_sessions"]),
+        ("s2s_sessions_max", "gauge", load["max_sessions"]),
+        ("s2s_sessions_waiting", "gauge", load["waiting"]),
+        ("s2s_sessions_admitted_total", "counter", load["admitted"]),
+        ("s2s_sessions_rejected_total", "counter", load["rejected"]),
+        ("s2s_bedrock_streams_opened_total", "counter", BEDROCK_STATUS["streams_opened"]),
+        ("s2s_bedrock_stream_failures_total", "counter", BEDROCK_STATUS["stream_failures"]),
+    ]
+    if counts is not None:
+        # Across every server sharing the backend (just this one with the in-memory backend)
+        samples.append(("s2s_cluster_sessions_active", "gauge", counts["cluster"]))
+        samples.append(("s2s_node_sessions_registered", "gauge", counts["node"]))
+    if MCP_CLIENT:
+        samples.append(("s2s_mcp_warm", "gauge", int(MCP_CLIENT.warm)))
+        samples.append(("s2s_mcp_processes_healthy", "gauge", sum(p.healthy for p in MCP_CLIENT.processes)))
+        if MCP_CLIENT.cache:
+            stats = MCP_CLIENT.cache.stats()
+            samples.append(("s2s_mcp_cache_hits_total", "counter", stats["hits"] + stats["remote_hits"]))
+            samples.append(("s2s_mcp_cache_misses_total", "counter", stats["misses"]))
+            samples.append(("s2s_mcp_cache_entries", "gauge", stats["entries"]))
+    if STRANDS_AGENT:
+        samples.append(("s2s_strands_warm", "gauge", int(STRANDS_AGENT.warm)))
+    sink = transcript_sink.get_sink()
+    if sink:
+        stats = sink.stats()
+        samples.append(("s2s_transcript_records_written_total", "counter", stats["written"]))
+        samples.append(("s2s_transcript_records_dropped_total", "counter", stats["dropped"]))
+        samples.append(("s2s_transcript_buffered", "gauge", stats["buffered"]))
+    if HEALTH_SERVER:
+        samples.append(("s2s_health_requests_total", "counter", HEALTH_SERVER.requests))
+    lines = []
+    for name, kind, value in samples:
+        lines.append(f"# TYPE {name} {kind}")
+        lines.append(f"{name} {value}")
+    return HTTPStatus.OK, "\n".join(lines) + "\n"
+
+
+async def sessions_endpoint(query):
+    """Live sessions on every node sharing the backend."""
+    sessions = await shared_state.run(shared_state.list_sessions)
+    return HTTPStatus.OK, {"count": len(sessions), "sessions": sessions}
+
+
+async def profile_endpoint(query):
+    """Run the sampling profiler for ?seconds=N and report where the output was written."""
+    try:
+        seconds = float(query.get("seconds", profiler.PROFILE_DEFAULT_SECONDS))
+    except ValueError:
+        return HTTPStatus.BAD_REQUEST, {"error": "seconds must be a number"}
+    try:
+        return HTTPStatus.OK, await profiler.profile(seconds, lambda: ADMISSION.active)
+    except profiler.ProfilerBusy as ex:
+        return HTTPStatus.CONFLICT, {"error": str(ex)}
 
 
 async def websocket_handler(websocket):
@@ -175,15 +201,23 @@ async def websocket_handler(websocket):
 
     stream_manager = None
     forward_task = None
+    admitted = False
     
     try:
         async for message in websocket:
+            receive_span, trace_token = None, None
             try:
                 data = json.loads(message)
                 if 'body' in data:
                     data = json.loads(data["body"])
                 if 'event' in data:
                     event_type = list(data['event'].keys())[0]
+
+                    # Trace everything this message triggers, except the high-rate audio chunks
+                    if event_type != "audioInput" or TRACE_AUDIO:
+                        receive_span = start_span("ws.receive", parent=stream_manager.trace_context if stream_manager else None,
+                                                  event=event_type, bytes=len(message))
+                        trace_token = attach_context(context_with(receive_span))
                     
                     # Handle session start - create new stream manager
                     if event_type == 'sessionStart':
@@ -197,12 +231,24 @@ async def websocket_handler(websocket):
                             except asyncio.CancelledError:
                                 pass
 
+                        # Admission control - one slot per connection with a live session
+                        if not admitted:
+                            admitted = await ADMISSION.acquire()
+                            if not admitted:
+                                await reject_session(websocket)
+                                break
+
                         """Handle WebSocket connections from the frontend."""
+                        # "mode": "text" asks for a text-only session; Bedrock must not see the field
+                        mode = data['event']['sessionStart'].pop('mode', 'audio')
+
                         # Create a new stream manager for this connection
-                        stream_manager = S2sSessionManager(model_id='amazon.nova-sonic-v1:0', region=aws_region, mcp_client=MCP_CLIENT, strands_agent=STRANDS_AGENT)
+                        stream_manager = S2sSessionManager(model_id='amazon.nova-sonic-v1:0', region=aws_region, mcp_client=MCP_CLIENT, strands_agent=STRANDS_AGENT,
+                                                           text_only=mode == 'text')
                         
                         # Initialize the Bedrock stream
                         await stream_manager.initialize_stream()
+                        await stream_manager.output_queue.put({"event": {"sessionMode": {"mode": "text" if stream_manager.text_only else "audio"}}})
                         
                         # Start a task to forward responses from Bedrock to the WebSocket
                         forward_task = asyncio.create_task(forward_responses(websocket, stream_manager))
@@ -219,6 +265,9 @@ async def websocket_handler(websocket):
                             except asyncio.CancelledError:
                                 pass
                             forward_task = None
+                        if admitted:
+                            ADMISSION.release()
+                            admitted = False
 
                     if event_type == "audioInput":
                         debug_print(message[0:180])
@@ -227,24 +276,7 @@ async def websocket_handler(websocket):
                     
                     # Only process events if we have an active stream manager
                     if stream_manager and stream_manager.is_active:
-                        # Store prompt name and content names if provided
-                        if event_type == 'promptStart':
-                            stream_manager.prompt_name = data['event']['promptStart']['promptName']
-                        elif event_type == 'contentStart' and data['event']['contentStart'].get('type') == 'AUDIO':
-                            stream_manager.audio_content_name = data['event']['contentStart']['contentName']
-                        
-                        # Handle audio input separately
-                        if event_type == 'audioInput':
-                            # Extract audio data
-                            prompt_name = data['event']['audioInput']['promptName']
-                            content_name = data['event']['audioInput']['contentName']
-                            audio_base64 = data['event']['audioInput']['content']
-                            
-                            # Add to the audio queue
-                            stream_manager.add_audio_chunk(prompt_name, content_name, audio_base64)
-                        else:
-                            # Send other events directly to Bedrock
-                            await stream_manager.send_raw_event(data)
+                        await stream_manager.handle_client_event(event_type, data)
                     elif event_type not in ['sessionStart', 'sessionEnd']:
                         debug_print(f"Received event {event_type} but no active stream manager")
                         
@@ -255,6 +287,10 @@ async def websocket_handler(websocket):
                 if DEBUG:
                     import traceback
                     traceback.print_exc()
+            finally:
+                if receive_span is not None:
+                    detach_context(trace_token)
+                    receive_span.end()
     except websockets.exceptions.ConnectionClosed:
         print("WebSocket connection closed")
     finally:
@@ -267,8 +303,18 @@ async def websocket_handler(websocket):
                 await forward_task
             except asyncio.CancelledError:
                 pass
-        if MCP_CLIENT:
-            MCP_CLIENT.cleanup()
+        if admitted:
+            ADMISSION.release()
+
+
+async def reject_session(websocket):
+    """Tell the client the server is at capacity and close with 1013 (try again later)."""
+    print(f"Rejecting session, server at capacity: {ADMISSION.load()}")
+    try:
+        await websocket.send(json.dumps({"event": {"sessionRejected": {"reason": "SERVER_BUSY"}}}))
+        await websocket.close(code=1013, reason="Server busy")
+    except websockets.exceptions.ConnectionClosed:
+        pass
 
 
 async def forward_responses(websocket, stream_manager):
@@ -296,9 +342,30 @@ async def forward_responses(websocket, stream_manager):
 
 async def main(host, port, health_port, enable_mcp=False, enable_strands_agent=False):
 
+    setup_tracing()
+    if transcript_sink.get_sink():
+        print(f"Writing transcripts to {transcript_sink.TRANSCRIPT_DIR}")
+
+    # Resolve AWS credentials once for all sessions and keep them refreshed in the background
+    credentials = await asyncio.to_thread(get_credentials_resolver)
+    print(f"AWS credentials: {credentials.status()}")
+
+    routes = {
+        "/": health,
+        "/health": health,
+        "/ready": readiness,
+        "/metrics": metrics,
+        "/sessions": sessions_endpoint,
+    }
+    if profiler.PROFILER_ENABLED:
+        routes["/debug/profile"] = profile_endpoint
+        if profiler.install_signal_handler(lambda: ADMISSION.active):
+            print(f"Profiler enabled, send SIGUSR2 to pid {os.getpid()} to profile for {profiler.PROFILE_DEFAULT_SECONDS}s")
+
     if health_port:
         try:
-            start_health_check_server(host, health_port)
+            global HEALTH_SERVER
+            HEALTH_SERVER = await HealthServer(host, health_port, routes).start()
         except Exception as ex:
             print("Failed to start health check endpoint",ex)
     
@@ -308,7 +375,10 @@ async def main(host, port, health_port, enable_mcp=False, enable_strands_agent=F
         try:
             global MCP_CLIENT
             MCP_CLIENT = McpLocationClient()
-            await MCP_CLIENT.connect_to_server()
+            if LAZY_CONNECT:
+                MCP_CLIENT.start_warm_up()
+            else:
+                await MCP_CLIENT.connect_to_server()
         except Exception as ex:
             print("Failed to start MCP client",ex)
     
@@ -317,20 +387,38 @@ async def main(host, port, health_port, enable_mcp=False, enable_strands_agent=F
         print("Strands agent enabled")
         try:
             global STRANDS_AGENT
-            STRANDS_AGENT = StrandsAgent()
+            STRANDS_AGENT = StrandsAgent(lazy=LAZY_CONNECT)
         except Exception as ex:
             print("Failed to start MCP client",ex)
 
+    # Share tool caches across server processes when a shared backend is configured
+    backend = shared_state.get_backend()
+    if backend.shared:
+        print(f"Using shared state backend {type(backend).__name__} as node {shared_state.NODE_ID}")
+        if MCP_CLIENT and MCP_CLIENT.cache:
+            MCP_CLIENT.cache.backend = backend
+        use_shared_cache(backend)
+
     """Main function to run the WebSocket server."""
     try:
         # Start WebSocket server
-        async with websockets.serve(websocket_handler, host, port):
-            print(f"WebSocket server started at host:{host}, port:{port}")
+        ws_options = websocket_options()
+        async with websockets.serve(websocket_handler, host, port, **ws_options):
+            print(f"WebSocket server started at host:{host}, port:{port} {ws_options}")
             
             # Keep the server running forever
             await asyncio.Future()
     except Exception as ex:
         print("Failed to start websocket service",ex)
+    finally:
+        if HEALTH_SERVER:
+            await HEALTH_SERVER.close()
+        # Shut down the MCP server pool shared by all connections
+        if MCP_CLIENT:
+            await MCP_CLIENT.cleanup()
+        shutdown_tracing()
+        # Flush buffered transcript records and ship the last file
+        await asyncio.to_thread(transcript_sink.close_sink)
 
 if __name__ == "__main__":
     import argparse
@@ -363,6 +451,8 @@ if __name__ == "__main__":
         else:
             print("Using AWS default credential chain (supports IAM roles, profiles, etc.)")
         
+        loop_name = install_event_loop()
+        print(f"Using {loop_name} event loop")
         try:
             asyncio.run(main(host, port, health_port, enable_mcp, enable_strands))
         except KeyboardInterrupt:
@@ -371,7 +461,4 @@ if __name__ == "__main__":
             print(f"Server error: {e}")
             if args.debug:
                 import traceback
-                traceback.print_exc()
-        finally:
-            if MCP_CLIENT:
-                MCP_CLIENT.cleanup()
\ No newline at end of file
+                traceback.print_exc()
\ No newline at end of file
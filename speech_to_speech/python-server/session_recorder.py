@@ -0,0 +1,79 @@
+"""Record both sides of S2S sessions for deterministic replay.
+
+With S2S_RECORD_DIR set, every session writes <session_id>.jsonl there:
+a header line, then one line per event with its offset in milliseconds from
+the session start:
+
+    {"t": 12.5, "dir": "in",   "event": {...}}     client event from the WebSocket
+    {"t": 840.1, "dir": "out", "event": {...}}     Bedrock output event
+    {"t": 1290.0, "dir": "tool", "tool_name": ..., "tool_use_id": ..., "result": ..., "duration_ms": ...}
+
+benchmarks/replay_session.py drives S2sSessionManager from these files.
+Recordings contain the full conversation audio and text; treat them as
+sensitive data.
+"""
+import json
+import os
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+RECORD_DIR = os.getenv("S2S_RECORD_DIR", "")
+FORMAT_VERSION = 1
+
+
+class SessionRecorder:
+    def __init__(self, path: str, session_id: str, model_id: str, text_only: bool = False):
+        self.path = path
+        self._start = time.perf_counter()
+        # Large buffer: audio events arrive every ~32 ms and must not wait on disk
+        self._file = open(path, "w", encoding="utf-8", buffering=1 << 20)
+        self._write({"type": "header", "version": FORMAT_VERSION, "session_id": session_id,
+                     "model_id": model_id, "text_only": text_only, "started_at": time.time()})
+
+    def _offset(self) -> float:
+        return round((time.perf_counter() - self._start) * 1000, 3)
+
+    def _write(self, line: Dict[str, Any]):
+        if self._file is not None:
+            self._file.write(json.dumps(line, default=str) + "\n")
+
+    def record(self, direction: str, event: Dict[str, Any]):
+        self._write({"t": self._offset(), "dir": direction, "event": event})
+
+    def record_tool(self, tool_name: str, tool_use_id: str, result: Any, duration_ms: float):
+        self._write({"t": self._offset(), "dir": "tool", "tool_name": tool_name, "tool_use_id": tool_use_id,
+                     "result": result, "duration_ms": round(duration_ms, 3)})
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def recorder_for(session_id: str, model_id: str, text_only: bool = False,
+                 directory: str = RECORD_DIR) -> Optional[SessionRecorder]:
+    """A recorder for the session, or None when recording is off."""
+    if not directory:
+        return None
+    try:
+        os.makedirs(directory, exist_ok=True)
+        return SessionRecorder(os.path.join(directory, f"{session_id}.jsonl"), session_id, model_id, text_only)
+    except OSError as ex:
+        print(f"Failed to start session recording: {ex}")
+        return None
+
+
+def load(path: str) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """Read a recording; returns (header, entries in time order)."""
+    header, entries = {}, []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            if entry.get("type") == "header":
+                header = entry
+            else:
+                entries.append(entry)
+    entries.sort(key=lambda e: e["t"])
+    return header, entries
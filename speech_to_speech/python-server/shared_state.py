@@ -0,0 +1,231 @@
+"""Shared state for horizontally scaled S2S servers.
+
+Tool result caches, session metadata and concurrency counters go through a
+SharedStateBackend. The default InMemoryBackend keeps everything in this
+process; set SHARED_STATE_URL=redis://host:port/db to share it across every
+server behind the load balancer (requires the `redis` package).
+"""
+import asyncio
+import json
+import os
+import socket
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional
+
+SHARED_STATE_URL = os.getenv("SHARED_STATE_URL", "")
+SHARED_STATE_PREFIX = os.getenv("SHARED_STATE_PREFIX", "s2s:")
+SESSION_TTL = int(os.getenv("SHARED_STATE_SESSION_TTL", "3600"))
+NODE_ID = os.getenv("NODE_ID", f"{socket.gethostname()}:{os.getpid()}")
+
+SESSION_INDEX_KEY = "sessions:index"
+
+_backend: Optional["SharedStateBackend"] = None
+_backend_lock = threading.Lock()
+
+
+class SharedStateBackend(ABC):
+    """Minimal key/value, counter and set operations used by the server.
+
+    Values are JSON-serializable objects. ttl is in seconds; None keeps the
+    key until it is deleted.
+    """
+    @abstractmethod
+    def get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def incr(self, key: str, amount: int = 1) -> int:
+        raise NotImplementedError
+
+    @abstractmethod
+    def add_member(self, key: str, member: str) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def remove_member(self, key: str, member: str) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def members(self, key: str) -> List[str]:
+        raise NotImplementedError
+
+    @property
+    def shared(self) -> bool:
+        """True when the state is visible to other processes."""
+        return False
+
+
+class InMemoryBackend(SharedStateBackend):
+    """Process-local backend; the default when SHARED_STATE_URL is not set."""
+    def __init__(self):
+        self._values: Dict[str, Any] = {}
+        self._expires: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def _live(self, key: str) -> bool:
+        expires_at = self._expires.get(key)
+        if expires_at is not None and expires_at < time.monotonic():
+            self._values.pop(key, None)
+            self._expires.pop(key, None)
+            return False
+        return key in self._values
+
+    def get(self, key):
+        with self._lock:
+            return self._values.get(key) if self._live(key) else None
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._values[key] = value
+            if ttl is None:
+                self._expires.pop(key, None)
+            else:
+                self._expires[key] = time.monotonic() + ttl
+
+    def delete(self, key):
+        with self._lock:
+            self._values.pop(key, None)
+            self._expires.pop(key, None)
+
+    def incr(self, key, amount=1):
+        with self._lock:
+            value = (self._values.get(key, 0) if self._live(key) else 0) + amount
+            self._values[key] = value
+            return value
+
+    def add_member(self, key, member):
+        with self._lock:
+            if not self._live(key):
+                self._values[key] = set()
+            self._values[key].add(member)
+
+    def remove_member(self, key, member):
+        with self._lock:
+            if self._live(key):
+                self._values[key].discard(member)
+
+    def members(self, key):
+        with self._lock:
+            return sorted(self._values[key]) if self._live(key) else []
+
+
+class RedisBackend(SharedStateBackend):
+    """Backend for Redis or any server speaking the Redis protocol."""
+    def __init__(self, url: str, prefix: str = SHARED_STATE_PREFIX, socket_timeout: float = 0.5):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("SHARED_STATE_URL is set but the `redis` package is not installed")
+        self.prefix = prefix
+        self.client = redis.Redis.from_url(url, socket_timeout=socket_timeout,
+                                           socket_connect_timeout=socket_timeout, decode_responses=True)
+
+    def _key(self, key):
+        return f"{self.prefix}{key}"
+
+    def get(self, key):
+        raw = self.client.get(self._key(key))
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key, value, ttl=None):
+        px = int(ttl * 1000) if ttl is not None else None
+        self.client.set(self._key(key), json.dumps(value, default=str), px=px)
+
+    def delete(self, key):
+        self.client.delete(self._key(key))
+
+    def incr(self, key, amount=1):
+        return int(self.client.incrby(self._key(key), amount))
+
+    def add_member(self, key, member):
+        self.client.sadd(self._key(key), member)
+
+    def remove_member(self, key, member):
+        self.client.srem(self._key(key), member)
+
+    def members(self, key):
+        return sorted(self.client.smembers(self._key(key)))
+
+    @property
+    def shared(self):
+        return True
+
+
+def create_backend(url: str = SHARED_STATE_URL) -> SharedStateBackend:
+    if not url:
+        return InMemoryBackend()
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisBackend(url)
+    raise RuntimeError(f"Unsupported SHARED_STATE_URL: {url}")
+
+
+def get_backend() -> SharedStateBackend:
+    """Return the process-wide backend, created from SHARED_STATE_URL on first use."""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = create_backend()
+        return _backend
+
+
+def set_backend(backend: SharedStateBackend) -> None:
+    global _backend
+    with _backend_lock:
+        _backend = backend
+
+
+def register_session(session_id: str, metadata: Dict[str, Any]) -> None:
+    """Record a started session; it expires after SESSION_TTL if never unregistered."""
+    backend = get_backend()
+    backend.set(f"session:{session_id}", {**metadata, "node": NODE_ID, "started_at": time.time()}, ttl=SESSION_TTL)
+    backend.add_member(SESSION_INDEX_KEY, session_id)
+
+
+def unregister_session(session_id: str) -> None:
+    backend = get_backend()
+    backend.delete(f"session:{session_id}")
+    backend.remove_member(SESSION_INDEX_KEY, session_id)
+
+
+def list_sessions() -> List[Dict[str, Any]]:
+    """Metadata for every live session across all nodes sharing the backend."""
+    backend = get_backend()
+    sessions = []
+    for session_id in backend.members(SESSION_INDEX_KEY):
+        metadata = backend.get(f"session:{session_id}")
+        if metadata is None:
+            # Expired without a clean shutdown (e.g. the node crashed)
+            backend.remove_member(SESSION_INDEX_KEY, session_id)
+            continue
+        sessions.append({"session_id": session_id, **metadata})
+    return sessions
+
+
+def session_counts() -> Dict[str, int]:
+    """Active sessions across every node sharing the backend, and those registered by this node.
+
+    Counted from the reconciled session index rather than kept as counters, so
+    sessions of a node that crashed drop out once their records expire.
+    """
+    sessions = list_sessions()
+    return {
+        "cluster": len(sessions),
+        "node": sum(1 for s in sessions if s.get("node") == NODE_ID),
+    }
+
+
+async def run(fn, *args):
+    """Call a shared-state helper from the event loop without blocking it on network I/O."""
+    if get_backend().shared:
+        return await asyncio.to_thread(fn, *args)
+    return fn(*args)
@@ -0,0 +1,265 @@
+"""Write-behind persistence of S2S transcripts, tool calls and turn latencies.
+
+Sessions hand records to TranscriptSink.record(), which only appends to a
+bounded in-memory buffer; a writer thread batches them into JSONL files and
+rotates files by size and age. When S2S_TRANSCRIPT_STORE is set, rotated
+files are uploaded and removed locally:
+
+    S2S_TRANSCRIPTS=true
+    S2S_TRANSCRIPT_DIR=/tmp/s2s-transcripts
+    S2S_TRANSCRIPT_STORE=s3://bucket/prefix      (S3_ENDPOINT_URL for S3-compatible stores)
+    S2S_TRANSCRIPT_STORE=file:///mnt/archive     (local stand-in with the same layout)
+
+If the buffer is full, records are dropped and counted rather than slowing
+the session down.
+"""
+import json
+import os
+import queue
+import shutil
+import socket
+import threading
+import time
+from typing import Any, Dict, Optional
+
+TRANSCRIPTS_ENABLED = os.getenv("S2S_TRANSCRIPTS", "false").lower() == "true"
+TRANSCRIPT_DIR = os.getenv("S2S_TRANSCRIPT_DIR", "/tmp/s2s-transcripts")
+TRANSCRIPT_STORE = os.getenv("S2S_TRANSCRIPT_STORE", "")
+BUFFER_SIZE = int(os.getenv("S2S_TRANSCRIPT_BUFFER_SIZE", "10000"))
+BATCH_SIZE = int(os.getenv("S2S_TRANSCRIPT_BATCH_SIZE", "500"))
+FLUSH_INTERVAL = float(os.getenv("S2S_TRANSCRIPT_FLUSH_INTERVAL", "2.0"))
+MAX_FILE_BYTES = int(os.getenv("S2S_TRANSCRIPT_MAX_FILE_BYTES", str(64 * 1024 * 1024)))
+MAX_FILE_AGE = float(os.getenv("S2S_TRANSCRIPT_MAX_FILE_AGE", "3600"))
+NODE = os.getenv("NODE_ID", f"{socket.gethostname()}-{os.getpid()}").replace(":", "-")
+
+_sink: Optional["TranscriptSink"] = None
+_sink_lock = threading.Lock()
+
+
+class LocalObjectStore:
+    """Stand-in for S3 that copies rotated files under a local directory."""
+    def __init__(self, root: str):
+        self.root = root
+
+    def upload(self, path: str, key: str):
+        target = os.path.join(self.root, key)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        shutil.copyfile(path, target)
+
+
+class S3ObjectStore:
+    def __init__(self, bucket: str, prefix: str = "", endpoint_url: Optional[str] = None):
+        import boto3
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+        self.client = boto3.client("s3", endpoint_url=endpoint_url or os.getenv("S3_ENDPOINT_URL") or None)
+
+    def upload(self, path: str, key: str):
+        self.client.upload_file(path, self.bucket, f"{self.prefix}/{key}" if self.prefix else key)
+
+
+def create_store(url: str = TRANSCRIPT_STORE):
+    if not url:
+        return None
+    if url.startswith("s3://"):
+        bucket, _, prefix = url[len("s3://"):].partition("/")
+        return S3ObjectStore(bucket, prefix)
+    if url.startswith("file://"):
+        return LocalObjectStore(url[len("file://"):])
+    raise RuntimeError(f"Unsupported S2S_TRANSCRIPT_STORE: {url}")
+
+
+class TranscriptSink:
+    """Bounded buffer drained by a writer thread into rotating JSONL files."""
+    def __init__(self, directory=TRANSCRIPT_DIR, buffer_size=BUFFER_SIZE, batch_size=BATCH_SIZE,
+                 flush_interval=FLUSH_INTERVAL, max_file_bytes=MAX_FILE_BYTES, max_file_age=MAX_FILE_AGE,
+                 store=None):
+        self.directory = directory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_file_bytes = max_file_bytes
+        self.max_file_age = max_file_age
+        self.store = store
+        self.written = 0
+        self.dropped = 0
+        self.rotations = 0
+        self.upload_failures = 0
+        self._buffer: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize=buffer_size)
+        self._stop = threading.Event()
+        self._thread = None
+        self._file = None
+        self._path = None
+        self._opened_at = 0.0
+        self._seq = 0
+
+    def start(self):
+        if self._thread is None:
+            os.makedirs(self.directory, exist_ok=True)
+            self._thread = threading.Thread(target=self._run, name="transcript-sink", daemon=True)
+            self._thread.start()
+        return self
+
+    def record(self, record: Dict[str, Any]) -> bool:
+        """Queue a record without blocking; returns False if it was dropped."""
+        try:
+            self._buffer.put_nowait(record)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def close(self, timeout: float = 10.0):
+        """Flush what is buffered, rotate the open file and stop the writer."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "buffered": self._buffer.qsize(),
+            "written": self.written,
+            "dropped": self.dropped,
+            "rotations": self.rotations,
+            "upload_failures": self.upload_failures,
+        }
+
+    def _run(self):
+        while not self._stop.is_set():
+            batch = self._next_batch()
+            if batch:
+                self._write(batch)
+            if self._file is not None and time.time() - self._opened_at >= self.max_file_age:
+                self._rotate()
+        # Drain on shutdown
+        while True:
+            batch = self._next_batch(wait=False)
+            if not batch:
+                break
+            self._write(batch)
+        self._rotate()
+
+    def _next_batch(self, wait=True):
+        batch = []
+        try:
+            if wait:
+                batch.append(self._buffer.get(timeout=self.flush_interval))
+            while len(batch) < self.batch_size:
+                batch.append(self._buffer.get_nowait())
+        except queue.Empty:
+            pass
+        return batch
+
+    def _write(self, batch):
+        try:
+            if self._file is None:
+                self._open()
+            self._file.write("".join(json.dumps(r, default=str) + "\n" for r in batch))
+            self._file.flush()
+            self.written += len(batch)
+            if self._file.tell() >= self.max_file_bytes:
+                self._rotate()
+        except Exception as ex:
+            self.dropped += len(batch)
+            print(f"Failed to write transcript batch: {ex}")
+
+    def _open(self):
+        self._seq += 1
+        name = f"transcripts-{NODE}-{time.strftime('%Y%m%d-%H%M%S')}-{self._seq:04d}.jsonl"
+        self._path = os.path.join(self.directory, name)
+        # The .open suffix marks the file still being written
+        self._file = open(self._path + ".open", "a", encoding="utf-8")
+        self._opened_at = time.time()
+
+    def _rotate(self):
+        if self._file is None:
+            return
+        self._file.close()
+        self._file = None
+        os.replace(self._path + ".open", self._path)
+        self.rotations += 1
+        if self.store is not None:
+            key = f"{time.strftime('%Y/%m/%d')}/{os.path.basename(self._path)}"
+            try:
+                self.store.upload(self._path, key)
+                os.remove(self._path)
+            except Exception as ex:
+                # Keep the local file so it can be shipped later
+                self.upload_failures += 1
+                print(f"Failed to upload transcript file {self._path}: {ex}")
+
+
+class SessionTranscript:
+    """Turns a session's model events into transcript and per-turn latency records.
+
+    A turn starts with the user's transcribed speech and ends when the next
+    one starts or the session closes. Its latency record has milliseconds from
+    the user's text to the first assistant text, first audio and completion,
+    plus time spent in tools.
+    """
+    def __init__(self, sink: TranscriptSink, session_id: str):
+        self.sink = sink
+        self.session_id = session_id
+        self.turn = 0
+        self._turn_start = None
+        self._marks: Dict[str, Any] = {}
+
+    def _emit(self, record_type, ts, **fields):
+        self.sink.record({"session_id": self.session_id, "turn": self.turn, "type": record_type, "ts": ts, **fields})
+
+    def _mark(self, name, ts):
+        if self._turn_start is not None and name not in self._marks:
+            self._marks[name] = ts - self._turn_start
+
+    def on_output_event(self, event_name: str, event: Dict[str, Any], ts: int):
+        """Called for every model output event with its receive timestamp (ms); must stay cheap."""
+        if event_name == "audioOutput":
+            self._mark("first_audio_ms", ts)
+        elif event_name == "textOutput":
+            role = event.get("role")
+            if role == "USER":
+                self._end_turn()
+                self.turn += 1
+                self._turn_start = ts
+            elif role == "ASSISTANT":
+                self._mark("first_text_ms", ts)
+            self._emit("text", ts, role=role, content=event.get("content"))
+        elif event_name == "toolUse":
+            self._mark("first_tool_ms", ts)
+            self._emit("tool_use", ts, tool_name=event.get("toolName"), tool_use_id=event.get("toolUseId"),
+                       content=event.get("content"))
+        elif event_name == "completionEnd":
+            self._mark("completion_ms", ts)
+
+    def on_tool_result(self, tool_name: str, tool_use_id: str, result: Any, duration_ms: float, ts: int):
+        self._marks["tool_ms"] = self._marks.get("tool_ms", 0) + round(duration_ms)
+        self._emit("tool_result", ts, tool_name=tool_name, tool_use_id=tool_use_id,
+                   result=result, duration_ms=round(duration_ms))
+
+    def _end_turn(self):
+        if self._turn_start is not None:
+            self._emit("turn_latency", int(time.time() * 1000), **self._marks)
+        self._turn_start = None
+        self._marks = {}
+
+    def close(self):
+        self._end_turn()
+
+
+def get_sink() -> Optional[TranscriptSink]:
+    """Return the process-wide sink, or None when S2S_TRANSCRIPTS is off."""
+    global _sink
+    if not TRANSCRIPTS_ENABLED:
+        return None
+    with _sink_lock:
+        if _sink is None:
+            _sink = TranscriptSink(store=create_store()).start()
+        return _sink
+
+
+def close_sink():
+    global _sink
+    with _sink_lock:
+        if _sink is not None:
+            _sink.close()
+            _sink = None